@@ -246,6 +246,71 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Function to run a batch of cache operations in one round trip and transaction
+CREATE OR REPLACE FUNCTION cache_pipeline(ops JSONB)
+RETURNS JSONB AS $$
+DECLARE
+    op JSONB;
+    entry JSONB;
+    affected INTEGER;
+    results JSONB := '[]'::JSONB;
+BEGIN
+    FOR op IN SELECT * FROM jsonb_array_elements(ops) LOOP
+        IF op->>'op' = 'set' THEN
+            entry := op->'entry';
+            INSERT INTO llm_response_cache (
+                cache_key, response_data, model_name, prompt_hash, expires_at, access_count
+            ) VALUES (
+                entry->>'cache_key',
+                entry->'response_data',
+                entry->>'model_name',
+                entry->>'prompt_hash',
+                (entry->>'expires_at')::TIMESTAMPTZ,
+                (entry->>'access_count')::INTEGER
+            )
+            ON CONFLICT (cache_key) DO UPDATE SET
+                response_data = EXCLUDED.response_data,
+                model_name = EXCLUDED.model_name,
+                prompt_hash = EXCLUDED.prompt_hash,
+                expires_at = EXCLUDED.expires_at,
+                access_count = EXCLUDED.access_count;
+            results := results || jsonb_build_array(TRUE);
+        ELSIF op->>'op' = 'get' THEN
+            -- Count the hit like CacheService.get does
+            entry := NULL;
+            UPDATE llm_response_cache c
+            SET access_count = c.access_count + 1
+            WHERE c.cache_key = op->>'cache_key' AND c.expires_at > NOW()
+            RETURNING c.response_data INTO entry;
+            results := results || jsonb_build_array(entry);
+        ELSIF op->>'op' = 'delete' THEN
+            DELETE FROM llm_response_cache WHERE cache_key = op->>'cache_key';
+            GET DIAGNOSTICS affected = ROW_COUNT;
+            results := results || jsonb_build_array(affected > 0);
+        ELSE
+            RAISE EXCEPTION 'Unknown cache operation: %', op->>'op';
+        END IF;
+    END LOOP;
+    RETURN results;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Function to list which of the given tables exist (used by setup_database.py)
+CREATE OR REPLACE FUNCTION get_existing_tables(names TEXT[])
+RETURNS TABLE(table_name TEXT) AS $$
+    SELECT t.table_name::TEXT
+    FROM information_schema.tables t
+    WHERE t.table_schema = 'public' AND t.table_name = ANY(names);
+$$ LANGUAGE sql STABLE;
+
+-- Function to list which of the given tables have RLS policies
+CREATE OR REPLACE FUNCTION get_tables_with_policies(names TEXT[])
+RETURNS TABLE(table_name TEXT) AS $$
+    SELECT DISTINCT p.tablename::TEXT
+    FROM pg_policies p
+    WHERE p.schemaname = 'public' AND p.tablename = ANY(names);
+$$ LANGUAGE sql STABLE;
+
 -- Function to update updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
@@ -2,7 +2,10 @@
 Supabase client configuration and initialization
 """
 import os
-from typing import Optional
+import asyncio
+import threading
+from typing import Optional, Tuple
+from urllib.parse import urlparse
 from supabase import create_client, Client
 from supabase.lib.client_options import ClientOptions
 import logging
@@ -14,15 +17,26 @@ class SupabaseClient:
     
     _instance: Optional['SupabaseClient'] = None
     _client: Optional[Client] = None
+    _address: Optional[Tuple[str, int]] = None
+    # Guards instance creation and client initialization across threads
+    _lock = threading.RLock()
     
     def __new__(cls) -> 'SupabaseClient':
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
         return cls._instance
     
     def __init__(self):
+        self._ensure_client()
+    
+    def _ensure_client(self):
+        """Initialize the client once, even when first used from several threads"""
         if self._client is None:
-            self._initialize_client()
+            with self._lock:
+                if self._client is None:
+                    self._initialize_client()
     
     def _initialize_client(self):
         """Initialize Supabase client with environment variables"""
@@ -42,6 +56,13 @@ class SupabaseClient:
             )
             
             self._client = create_client(url, service_key, options)
+            
+            # Host and port for TCP-level health checks
+            parsed_url = urlparse(url)
+            self._address = (
+                parsed_url.hostname,
+                parsed_url.port or (443 if parsed_url.scheme == 'https' else 80)
+            )
             logger.info("Supabase client initialized successfully")
             
         except Exception as e:
@@ -51,8 +72,7 @@ class SupabaseClient:
     @property
     def client(self) -> Client:
         """Get the Supabase client instance"""
-        if self._client is None:
-            self._initialize_client()
+        self._ensure_client()
         return self._client
     
     async def health_check(self) -> bool:
@@ -64,16 +84,35 @@ class SupabaseClient:
         except Exception as e:
             logger.error(f"Supabase health check failed: {e}")
             return False
+    
+    async def health_check_fast(self, timeout: float = 2.0) -> bool:
+        """
+        Check if Supabase is reachable with a TCP connect
+        
+        A connect to the project host, taken from SUPABASE_URL when the
+        client is initialized, tells that it is up without a TLS handshake
+        or query. Falls back to the full health_check if no address is known.
+        """
+        if self._address is None:
+            return await self.health_check()
+        
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(*self._address), timeout
+            )
+            writer.close()
+            await writer.wait_closed()
+            return True
+        except (OSError, asyncio.TimeoutError) as e:
+            logger.error(f"Supabase TCP health check failed: {e}")
+            return False
 
 # Global instance (lazy initialization)
 _supabase_client: Optional[SupabaseClient] = None
 
 def get_supabase() -> Client:
     """Get Supabase client instance"""
-    global _supabase_client
-    if _supabase_client is None:
-        _supabase_client = SupabaseClient()
-    return _supabase_client.client
+    return get_supabase_client().client
 
 def get_supabase_client() -> SupabaseClient:
     """Get Supabase client wrapper instance"""
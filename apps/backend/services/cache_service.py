@@ -3,12 +3,13 @@ Supabase-based caching service for LLM responses and other data
 Implements persistent caching with TTL, statistics tracking, and cleanup
 """
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime, timedelta
 import hashlib
 import json
 import asyncio
 from dataclasses import dataclass
+from functools import lru_cache
 
 from database.supabase_client import get_supabase
 from config import get_settings
@@ -16,6 +17,17 @@ from config import get_settings
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Distinct cache key contents whose hashes are kept in memory
+CACHE_KEY_MEMO_SIZE = 4096
+
+# Rows written per upsert request by set_many
+CACHE_BULK_SIZE = 500
+
+@lru_cache(maxsize=CACHE_KEY_MEMO_SIZE)
+def _hash_cache_key_content(content: str) -> str:
+    """Hash cache key content, memoized since identical requests repeat"""
+    return hashlib.sha256(content.encode()).hexdigest()[:32]
+
 @dataclass
 class CacheStats:
     """Cache statistics data class"""
@@ -82,21 +94,7 @@ class CacheService:
         """Set cached data with TTL"""
         try:
             ttl = ttl_hours or self.default_ttl_hours
-            expires_at = datetime.now() + timedelta(hours=ttl)
-            prompt_hash = self._generate_prompt_hash(prompt_text)
-            
-            # Calculate approximate size
-            data_size = len(json.dumps(data).encode('utf-8'))
-            
-            cache_data = {
-                'cache_key': cache_key,
-                'response_data': data,
-                'model_name': model_name,
-                'prompt_hash': prompt_hash,
-                'expires_at': expires_at.isoformat(),
-                'access_count': 1,
-                'size_bytes': data_size
-            }
+            cache_data = self._build_cache_entry(cache_key, data, model_name, prompt_text, ttl)
             
             # Use upsert to handle duplicate keys
             result = self.supabase.table('llm_response_cache').upsert(
@@ -111,6 +109,88 @@ class CacheService:
             logger.error(f"Cache set error for key {cache_key}: {e}")
             return False
     
+    async def set_many(self, items: List[Tuple[Any, ...]]) -> int:
+        """
+        Set many cache entries with one bulk upsert per CACHE_BULK_SIZE rows
+        
+        Each item holds the arguments of set: (cache_key, data[, model_name,
+        prompt_text, ttl_hours]). Returns the number of entries stored.
+        """
+        # One upsert can't touch a key twice, so the last entry per key wins,
+        # as it would with sequential set calls
+        rows = list({item[0]: self._set_entry(*item) for item in items}.values())
+        stored_count = 0
+        
+        for i in range(0, len(rows), CACHE_BULK_SIZE):
+            chunk = rows[i:i + CACHE_BULK_SIZE]
+            try:
+                result = self.supabase.table('llm_response_cache').upsert(
+                    chunk,
+                    on_conflict='cache_key'
+                ).execute()
+                stored_count += len(result.data)
+                
+            except Exception as e:
+                logger.error(f"Cache bulk set error for {len(chunk)} entries: {e}")
+        
+        logger.debug(f"Cache bulk set stored {stored_count}/{len(rows)} entries")
+        return stored_count
+    
+    async def delete_many(self, cache_keys: List[str]) -> int:
+        """Delete cached data for many keys, returning the number deleted"""
+        deleted_count = 0
+        
+        for i in range(0, len(cache_keys), CACHE_BULK_SIZE):
+            chunk = cache_keys[i:i + CACHE_BULK_SIZE]
+            try:
+                result = self.supabase.table('llm_response_cache').delete().in_(
+                    'cache_key', chunk
+                ).execute()
+                deleted_count += len(result.data)
+                
+            except Exception as e:
+                logger.error(f"Cache bulk delete error for {len(chunk)} keys: {e}")
+        
+        return deleted_count
+    
+    async def pipeline(self, ops: List[Tuple[Any, ...]]) -> List[Any]:
+        """Run cache operations in one round trip and transaction
+        
+        Each op is ("set", cache_key, data[, model_name, prompt_text, ttl_hours]),
+        ("get", cache_key) or ("delete", cache_key). Results come back in order,
+        shaped like the matching set/get/delete return values.
+        """
+        payload = []
+        for op in ops:
+            if op[0] == 'set':
+                payload.append({'op': 'set', 'entry': self._set_entry(*op[1:])})
+            elif op[0] in ('get', 'delete'):
+                payload.append({'op': op[0], 'cache_key': op[1]})
+            else:
+                raise ValueError(f"Unknown cache operation: {op[0]}")
+        
+        try:
+            result = self.supabase.rpc('cache_pipeline', {'ops': payload}).execute()
+            
+            logger.debug(f"Cache pipeline ran {len(payload)} operations")
+            return list(result.data)
+            
+        except Exception as e:
+            logger.error(f"Cache pipeline error: {e}")
+            return [None if op['op'] == 'get' else False for op in payload]
+    
+    def _set_entry(
+        self,
+        cache_key: str,
+        data: Dict[str, Any],
+        model_name: str = "default",
+        prompt_text: str = "",
+        ttl_hours: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Build a set entry for pipeline or set_many, taking the same arguments as set"""
+        ttl = ttl_hours or self.default_ttl_hours
+        return self._build_cache_entry(cache_key, data, model_name, prompt_text, ttl)
+    
     async def delete(self, cache_key: str) -> bool:
         """Delete cached data by key"""
         try:
@@ -295,7 +375,31 @@ class CacheService:
             content += f":{params_str}"
         
         # Generate SHA256 hash and truncate to 32 characters
-        return hashlib.sha256(content.encode()).hexdigest()[:32]
+        return _hash_cache_key_content(content)
+    
+    def _build_cache_entry(
+        self,
+        cache_key: str,
+        data: Dict[str, Any],
+        model_name: str,
+        prompt_text: str,
+        ttl_hours: int
+    ) -> Dict[str, Any]:
+        """Build the llm_response_cache row stored for a cache set"""
+        expires_at = datetime.now() + timedelta(hours=ttl_hours)
+        
+        # Calculate approximate size
+        data_size = len(json.dumps(data).encode('utf-8'))
+        
+        return {
+            'cache_key': cache_key,
+            'response_data': data,
+            'model_name': model_name,
+            'prompt_hash': self._generate_prompt_hash(prompt_text),
+            'expires_at': expires_at.isoformat(),
+            'access_count': 1,
+            'size_bytes': data_size
+        }
     
     def _generate_prompt_hash(self, prompt: str) -> str:
         """Generate hash for prompt content"""
@@ -314,8 +418,7 @@ class CacheService:
     async def warm_cache(self, entries: List[Dict[str, Any]]) -> int:
         """Warm cache with predefined entries"""
         try:
-            warmed_count = 0
-            
+            items = []
             for entry in entries:
                 cache_key = self.generate_cache_key(
                     entry['model'],
@@ -324,16 +427,15 @@ class CacheService:
                     entry.get('params')
                 )
                 
-                success = await self.set(
+                items.append((
                     cache_key,
                     entry['response_data'],
                     entry['model'],
                     entry['prompt'],
                     entry.get('ttl_hours')
-                )
-                
-                if success:
-                    warmed_count += 1
+                ))
+            
+            warmed_count = await self.set_many(items)
             
             logger.info(f"Cache warmed with {warmed_count} entries")
             return warmed_count
@@ -26,11 +26,15 @@ class DatabaseService:
     def __init__(self):
         self.supabase = get_supabase()
     
+    async def _execute(self, query):
+        """Execute a Supabase query; the integration tests override this to overlap calls"""
+        return query.execute()
+    
     # Profile operations
     async def get_profile(self, user_id: str) -> Optional[Profile]:
         """Get user profile by ID"""
         try:
-            result = self.supabase.table('profiles').select('*').eq('id', user_id).execute()
+            result = await self._execute(self.supabase.table('profiles').select('*').eq('id', user_id))
             if result.data:
                 return Profile(**result.data[0])
             return None
@@ -39,13 +43,19 @@ class DatabaseService:
             raise
     
     async def create_profile(self, user_id: str, profile_data: ProfileCreate) -> Profile:
-        """Create a new user profile"""
+        """Create a new user profile, keeping the existing one if it is already there"""
         try:
             data = profile_data.dict()
             data['id'] = user_id
             
-            result = self.supabase.table('profiles').insert(data).execute()
-            return Profile(**result.data[0])
+            result = await self._execute(self.supabase.table('profiles').upsert(
+                data, on_conflict='id', ignore_duplicates=True
+            ))
+            if result.data:
+                return Profile(**result.data[0])
+            
+            # ON CONFLICT DO NOTHING returns no rows for a profile that already exists
+            return await self.get_profile(user_id)
         except Exception as e:
             logger.error(f"Error creating profile for user {user_id}: {e}")
             raise
@@ -58,7 +68,7 @@ class DatabaseService:
                 # No updates provided, return current profile
                 return await self.get_profile(user_id)
             
-            result = self.supabase.table('profiles').update(data).eq('id', user_id).execute()
+            result = await self._execute(self.supabase.table('profiles').update(data).eq('id', user_id))
             return Profile(**result.data[0])
         except Exception as e:
             logger.error(f"Error updating profile {user_id}: {e}")
@@ -76,10 +86,10 @@ class DatabaseService:
             new_scans_used = profile.scans_used + increment
             new_scans_remaining = max(0, profile.scans_remaining - increment)
             
-            result = self.supabase.table('profiles').update({
+            result = await self._execute(self.supabase.table('profiles').update({
                 'scans_used': new_scans_used,
                 'scans_remaining': new_scans_remaining
-            }).eq('id', user_id).execute()
+            }).eq('id', user_id))
             
             return Profile(**result.data[0])
         except Exception as e:
@@ -90,7 +100,7 @@ class DatabaseService:
     async def get_user_brands(self, user_id: str) -> List[Brand]:
         """Get all brands for a user"""
         try:
-            result = self.supabase.table('brands').select('*').eq('user_id', user_id).order('created_at', desc=True).execute()
+            result = await self._execute(self.supabase.table('brands').select('*').eq('user_id', user_id).order('created_at', desc=True))
             return [Brand(**brand) for brand in result.data]
         except Exception as e:
             logger.error(f"Error getting brands for user {user_id}: {e}")
@@ -99,7 +109,7 @@ class DatabaseService:
     async def get_brand(self, brand_id: str, user_id: str) -> Optional[Brand]:
         """Get a specific brand by ID (with user ownership check)"""
         try:
-            result = self.supabase.table('brands').select('*').eq('id', brand_id).eq('user_id', user_id).execute()
+            result = await self._execute(self.supabase.table('brands').select('*').eq('id', brand_id).eq('user_id', user_id))
             if result.data:
                 return Brand(**result.data[0])
             return None
@@ -114,12 +124,31 @@ class DatabaseService:
             data['user_id'] = user_id
             data['id'] = str(uuid.uuid4())
             
-            result = self.supabase.table('brands').insert(data).execute()
+            result = await self._execute(self.supabase.table('brands').insert(data))
             return Brand(**result.data[0])
         except Exception as e:
             logger.error(f"Error creating brand for user {user_id}: {e}")
             raise
     
+    async def create_brands_bulk(self, user_id: str, brands: List[BrandCreate]) -> List[Brand]:
+        """Create several brands for a user in a single insert"""
+        try:
+            if not brands:
+                return []
+            
+            rows = []
+            for brand_data in brands:
+                data = brand_data.dict()
+                data['user_id'] = user_id
+                data['id'] = str(uuid.uuid4())
+                rows.append(data)
+            
+            result = await self._execute(self.supabase.table('brands').insert(rows))
+            return [Brand(**brand) for brand in result.data]
+        except Exception as e:
+            logger.error(f"Error creating {len(brands)} brands for user {user_id}: {e}")
+            raise
+    
     async def update_brand(self, brand_id: str, user_id: str, brand_data: BrandUpdate) -> Brand:
         """Update a brand"""
         try:
@@ -128,7 +157,7 @@ class DatabaseService:
                 # No updates provided, return current brand
                 return await self.get_brand(brand_id, user_id)
             
-            result = self.supabase.table('brands').update(data).eq('id', brand_id).eq('user_id', user_id).execute()
+            result = await self._execute(self.supabase.table('brands').update(data).eq('id', brand_id).eq('user_id', user_id))
             if not result.data:
                 raise ValueError(f"Brand {brand_id} not found or access denied")
             return Brand(**result.data[0])
@@ -139,7 +168,7 @@ class DatabaseService:
     async def delete_brand(self, brand_id: str, user_id: str) -> bool:
         """Delete a brand"""
         try:
-            result = self.supabase.table('brands').delete().eq('id', brand_id).eq('user_id', user_id).execute()
+            result = await self._execute(self.supabase.table('brands').delete().eq('id', brand_id).eq('user_id', user_id))
             return len(result.data) > 0
         except Exception as e:
             logger.error(f"Error deleting brand {brand_id}: {e}")
@@ -149,7 +178,7 @@ class DatabaseService:
     async def get_user_scans(self, user_id: str, limit: int = 50) -> List[Scan]:
         """Get all scans for a user"""
         try:
-            result = self.supabase.table('scans').select('*').eq('user_id', user_id).order('started_at', desc=True).limit(limit).execute()
+            result = await self._execute(self.supabase.table('scans').select('*').eq('user_id', user_id).order('started_at', desc=True).limit(limit))
             return [Scan(**scan) for scan in result.data]
         except Exception as e:
             logger.error(f"Error getting scans for user {user_id}: {e}")
@@ -158,7 +187,7 @@ class DatabaseService:
     async def get_scan(self, scan_id: str, user_id: str) -> Optional[Scan]:
         """Get a specific scan by ID"""
         try:
-            result = self.supabase.table('scans').select('*').eq('id', scan_id).eq('user_id', user_id).execute()
+            result = await self._execute(self.supabase.table('scans').select('*').eq('id', scan_id).eq('user_id', user_id))
             if result.data:
                 return Scan(**result.data[0])
             return None
@@ -176,7 +205,7 @@ class DatabaseService:
             data['progress'] = 0
             data['started_at'] = datetime.now().isoformat()
             
-            result = self.supabase.table('scans').insert(data).execute()
+            result = await self._execute(self.supabase.table('scans').insert(data))
             return Scan(**result.data[0])
         except Exception as e:
             logger.error(f"Error creating scan for user {user_id}: {e}")
@@ -193,7 +222,7 @@ class DatabaseService:
             if 'status' in data and data['status'] in [ScanStatus.COMPLETED, ScanStatus.FAILED]:
                 data['completed_at'] = datetime.now().isoformat()
             
-            result = self.supabase.table('scans').update(data).eq('id', scan_id).execute()
+            result = await self._execute(self.supabase.table('scans').update(data).eq('id', scan_id))
             if not result.data:
                 raise ValueError(f"Scan {scan_id} not found")
             return Scan(**result.data[0])
@@ -208,7 +237,7 @@ class DatabaseService:
             data = result_data.dict()
             data['id'] = str(uuid.uuid4())
             
-            result = self.supabase.table('visibility_results').insert(data).execute()
+            result = await self._execute(self.supabase.table('visibility_results').insert(data))
             return VisibilityResult(**result.data[0])
         except Exception as e:
             logger.error(f"Error creating visibility result: {e}")
@@ -217,7 +246,7 @@ class DatabaseService:
     async def get_visibility_result(self, scan_id: str) -> Optional[VisibilityResult]:
         """Get visibility result by scan ID"""
         try:
-            result = self.supabase.table('visibility_results').select('*').eq('scan_id', scan_id).execute()
+            result = await self._execute(self.supabase.table('visibility_results').select('*').eq('scan_id', scan_id))
             if result.data:
                 return VisibilityResult(**result.data[0])
             return None
@@ -231,7 +260,7 @@ class DatabaseService:
             data = result_data.dict()
             data['id'] = str(uuid.uuid4())
             
-            result = self.supabase.table('audit_results').insert(data).execute()
+            result = await self._execute(self.supabase.table('audit_results').insert(data))
             return AuditResult(**result.data[0])
         except Exception as e:
             logger.error(f"Error creating audit result: {e}")
@@ -240,7 +269,7 @@ class DatabaseService:
     async def get_audit_result(self, scan_id: str) -> Optional[AuditResult]:
         """Get audit result by scan ID"""
         try:
-            result = self.supabase.table('audit_results').select('*').eq('scan_id', scan_id).execute()
+            result = await self._execute(self.supabase.table('audit_results').select('*').eq('scan_id', scan_id))
             if result.data:
                 return AuditResult(**result.data[0])
             return None
@@ -257,7 +286,7 @@ class DatabaseService:
                 result_dict['id'] = str(uuid.uuid4())
                 data.append(result_dict)
             
-            result = self.supabase.table('simulation_results').insert(data).execute()
+            result = await self._execute(self.supabase.table('simulation_results').insert(data))
             return [SimulationResult(**item) for item in result.data]
         except Exception as e:
             logger.error(f"Error creating simulation results: {e}")
@@ -266,7 +295,7 @@ class DatabaseService:
     async def get_simulation_results(self, scan_id: str) -> List[SimulationResult]:
         """Get simulation results by scan ID"""
         try:
-            result = self.supabase.table('simulation_results').select('*').eq('scan_id', scan_id).order('created_at').execute()
+            result = await self._execute(self.supabase.table('simulation_results').select('*').eq('scan_id', scan_id).order('created_at'))
             return [SimulationResult(**item) for item in result.data]
         except Exception as e:
             logger.error(f"Error getting simulation results for scan {scan_id}: {e}")
@@ -276,14 +305,14 @@ class DatabaseService:
     async def get_cached_response(self, cache_key: str) -> Optional[Dict[str, Any]]:
         """Get cached LLM response"""
         try:
-            result = self.supabase.table('llm_response_cache').select('*').eq('cache_key', cache_key).gt('expires_at', datetime.now().isoformat()).execute()
+            result = await self._execute(self.supabase.table('llm_response_cache').select('*').eq('cache_key', cache_key).gt('expires_at', datetime.now().isoformat()))
             
             if result.data:
                 # Update access count
                 cache_entry = result.data[0]
-                self.supabase.table('llm_response_cache').update({
+                await self._execute(self.supabase.table('llm_response_cache').update({
                     'access_count': cache_entry['access_count'] + 1
-                }).eq('id', cache_entry['id']).execute()
+                }).eq('id', cache_entry['id']))
                 
                 return cache_entry['response_data']
             return None
@@ -307,7 +336,7 @@ class DatabaseService:
             }
             
             # Use upsert to handle duplicate keys
-            result = self.supabase.table('llm_response_cache').upsert(data).execute()
+            result = await self._execute(self.supabase.table('llm_response_cache').upsert(data))
             return len(result.data) > 0
         except Exception as e:
             logger.error(f"Error caching response {cache_key}: {e}")
@@ -316,7 +345,7 @@ class DatabaseService:
     async def clean_expired_cache(self) -> int:
         """Clean expired cache entries"""
         try:
-            result = self.supabase.rpc('clean_expired_cache').execute()
+            result = await self._execute(self.supabase.rpc('clean_expired_cache'))
             return result.data if result.data else 0
         except Exception as e:
             logger.error(f"Error cleaning expired cache: {e}")
@@ -7,42 +7,629 @@ This service analyzes websites for LLM-friendly content and structure,
 providing a detailed audit with actionable recommendations for optimization.
 """
 import requests
+from urllib3.util.request import ACCEPT_ENCODING
 from bs4 import BeautifulSoup
+import soupsieve as sv
+import orjson
 from typing import Dict, List, Optional, Tuple, Any, Set
 import json
 import re
+import os
+import copy
+import time
+import threading
+import asyncio
+import atexit
 import logging
-from urllib.parse import urljoin, urlparse
+import multiprocessing
+from urllib.parse import urljoin, urlparse, urlsplit
 from datetime import datetime
 import hashlib
-from collections import Counter
+from bisect import bisect_left, bisect_right
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
+# Cap on downloaded HTML; pathological pages are truncated rather than parsed in full
+MAX_BODY_BYTES = 2 * 1024 * 1024
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Recently failed hosts -> (expires_at, error result), shared by all scraper instances
+_negative_cache: Dict[str, Tuple[float, Dict]] = {}
+NEGATIVE_CACHE_MAX_ENTRIES = 4096
+CONNECTION_FAILURE_TTL_SECONDS = 300  # Connection errors and timeouts
+SERVER_ERROR_TTL_SECONDS = 60  # HTTP 5xx responses
+
+# Readability metrics keyed by a digest of the page text, least recently used first
+_readability_cache: 'OrderedDict[bytes, Dict]' = OrderedDict()
+READABILITY_CACHE_MAX_ENTRIES = 1024
+READABILITY_CACHE_MAX_TEXT_BYTES = 1024 * 1024  # Larger texts are not cached
+
+# Page analyses keyed by a digest of the URL, declared charset and body,
+# least recently used first. Entries hold the schema, meta and content
+# analyses plus the link and viewport checks, so an unchanged page is not
+# parsed again; timing, page size and the sitemap/robots probes are always fresh
+_document_cache: 'OrderedDict[bytes, Dict]' = OrderedDict()
+DOCUMENT_CACHE_MAX_ENTRIES = 256
+
+# Points per high-value schema type in the schema quality score
+_HIGH_VALUE_TYPES = {
+    'Organization': 8,
+    'LocalBusiness': 8,
+    'Product': 8,
+    'FAQPage': 7,
+    'Article': 7,
+    'BreadcrumbList': 5,
+    'WebSite': 5,
+    'Person': 5,
+    'Review': 5,
+    'Event': 4,
+    'Recipe': 4,
+    'HowTo': 4
+}
+_HIGH_VALUE_TYPE_KEYS = frozenset(_HIGH_VALUE_TYPES)
+
+# Brand separator in a structured title, e.g. "Primary Keyword | Brand Name"
+_TITLE_SEPARATOR_RE = re.compile(r'\s[\|\-\–\—]\s')
+
+# Content analysis patterns (FAQ headings, readability, keyword density)
+_FAQ_HEADING_RE = re.compile(r'^Q[:.)]|Question|FAQ', re.I)
+_FAQ_PREFIX_RE = re.compile(r'^Q[:.)]|\s*')
+_FAQ_HEADING_TAGS = ('h2', 'h3', 'h4', 'h5', 'h6', 'strong')
+_WHITESPACE_RE = re.compile(r'\s+')
+_SENTENCE_END_TABLE = str.maketrans('!?', '..')  # Sentences split on '.' after mapping ! and ?
+_NON_ALPHA_RE = re.compile(r'[^a-z]')
+_WORD_RE = re.compile(r'\b\w+\b')
+
+# Entity mention patterns (simple capitalization heuristics, no NLP)
+_PERSON_NAME_RE = re.compile(r'\b[A-Z][a-z]+\s+[A-Z][a-z]+\b')
+_ORGANIZATION_RE = re.compile(r'\b[A-Z][A-Za-z0-9\s]+\s+(?:Inc|LLC|Ltd|Corp|Corporation|Company)\b')
+_LOCATION_RES = (
+    re.compile(r'\b[A-Z][a-z]+,\s+[A-Z]{2}\b'),  # City, State
+    re.compile(r'\b[A-Z][a-z]+,\s+[A-Z][a-z]+\b')  # City, Country
+)
+# Every entity pattern needs an uppercase ASCII letter
+_UPPERCASE_RE = re.compile(r'[A-Z]')
+# Prefilter for the person, location and product patterns, which all start
+# with a capitalized word
+_CAPITALIZED_WORD_RE = re.compile(r'[A-Z][a-z]')
+# Literal prefilter for _ORGANIZATION_RE: every match ends in one of these suffixes
+_ORGANIZATION_SUFFIX_RE = re.compile(r'\s(?:Inc|LLC|Ltd|Corp|Corporation|Company)\b')
+_PRODUCT_RE = re.compile(r'\b[A-Z][a-z]+\s+(?:[A-Z0-9]{1,4}-[A-Z0-9]{1,4}|[A-Z0-9]{3,10})\b')
+_COMMON_NAME_PHRASES = frozenset({'New York', 'United States', 'Home Page', 'Privacy Policy'})
+_MAX_ENTITY_MENTIONS = 10  # per entity type
+
+# Common words excluded from keyword density
+STOP_WORDS = frozenset({
+    'the', 'and', 'a', 'an', 'in', 'on', 'at', 'to', 'for', 'of',
+    'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
+    'this', 'that', 'these', 'those', 'it', 'its', 'from', 'as'
+})
+
+# Maps a-z to '1' (vowel) or '0' (consonant) so vowel groups can be counted
+# with str.count on the translated mask instead of a per-character loop
+_SYLLABLE_VOWELS = "aeiouy"
+_SYLLABLE_MASK_TABLE = str.maketrans({
+    c: '1' if c in _SYLLABLE_VOWELS else '0' for c in 'abcdefghijklmnopqrstuvwxyz'
+})
+
+# CSS selectors compiled once instead of per find_all/select call
+_JSONLD_SELECTOR = sv.compile('script[type="application/ld+json"]')
+
+# Accordion markers, checked in this order: the classes .accordion, .collapse
+# and .expandable, then [data-toggle="collapse"]
+_ACCORDION_CLASSES = ('accordion', 'collapse', 'expandable')
+
+# Content diversity components after headings, as (count that earns the full
+# share, share of the score): paragraphs, lists, tables, FAQs, images and
+# semantic elements
+_DIVERSITY_COMPONENTS = ((50, 0.15), (5, 0.15), (2, 0.1), (3, 0.15), (10, 0.1), (10, 0.15))
+
+# Recommendation priority levels, most urgent first
+RECOMMENDATION_PRIORITIES = ("high", "medium", "low")
+
+# Anchor targets that are not links to a page
+_SKIPPED_HREF_PREFIXES = ('#', 'javascript:')
+
+_HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+# Elements the shared descendants pass keeps for a closer look
+_INDEXED_ELEMENT_TAGS = ('p', 'table', 'figure')
+
+# Semantic HTML5 elements counted by _analyze_semantic_elements, in report order
+_SEMANTIC_ELEMENTS = (
+    'header', 'footer', 'main', 'article', 'section',
+    'nav', 'aside', 'figure', 'figcaption', 'time',
+    'mark', 'details', 'summary'
+)
+
+def _build_length_score_lut(size: int, bands: Tuple[Tuple[int, int, float], ...],
+                            default: float = 0.3) -> Tuple[float, ...]:
+    """Precompute length -> score factor; bands are (min, max, factor), first match wins, else default"""
+    lut = []
+    for length in range(size):
+        for low, high, factor in bands:
+            if low <= length <= high:
+                lut.append(factor)
+                break
+        else:
+            lut.append(default)
+    return tuple(lut)
+
+# Ideal title length for LLMs: 50-65 chars (good 40-75, acceptable 30-85)
+_TITLE_SCORE_LUT = _build_length_score_lut(300, ((50, 65, 1.0), (40, 75, 0.8), (30, 85, 0.6)))
+
+# Ideal description length for LLMs: 140-170 chars (good 120-190, acceptable 100-220)
+_DESCRIPTION_SCORE_LUT = _build_length_score_lut(400, ((140, 170, 1.0), (120, 190, 0.8), (100, 220, 0.6)))
+
+# Title/description quality points in the meta score (the last entry covers every longer text)
+_TITLE_POINTS_LUT = _build_length_score_lut(100, ((50, 60, 10), (40, 70, 7), (30, 80, 5)), default=2)
+_DESCRIPTION_POINTS_LUT = _build_length_score_lut(256, ((140, 160, 10), (120, 180, 7), (100, 200, 5)), default=2)
+
+# Score ladders as (thresholds, points). "At least" ladders are looked up with
+# bisect_right (value >= threshold moves up a step); "at most" ladders with
+# bisect_left (value <= threshold stays on that step).
+_SCHEMA_COUNT_LADDER = ((2, 3), (5, 10, 15))
+_PROPERTY_COUNT_LADDER = ((1, 5, 10, 15, 20), (0, 5, 10, 20, 25, 30))
+_WORD_COUNT_LADDER = ((300, 500, 1000, 1500), (0, 5, 10, 15, 20))
+_LIST_COUNT_LADDER = ((1, 3), (0, 5, 10))
+_LIST_ITEM_LADDER = ((1, 10), (0, 2, 5))
+_FAQ_COUNT_LADDER = ((1, 2, 3), (0, 10, 15, 20))
+_INTERNAL_LINK_LADDER = ((1, 5, 10, 20), (0, 2, 5, 7, 10))
+_EXTERNAL_LINK_LADDER = ((1, 3, 5), (0, 5, 7, 10))
+_PAGE_SIZE_KB_LADDER = ((500, 1000, 2000, 3000), (10, 7, 5, 2, 0))  # at most
+_LOAD_TIME_MS_LADDER = ((500, 1000, 2000, 3000), (10, 7, 5, 2, 0))  # at most
+
+def _at_least_points(ladder: Tuple[Tuple, Tuple], value: float) -> int:
+    """Points for the highest threshold that value reaches"""
+    thresholds, points = ladder
+    return points[bisect_right(thresholds, value)]
+
+def _at_most_points(ladder: Tuple[Tuple, Tuple], value: float) -> int:
+    """Points for the lowest threshold that value stays within"""
+    thresholds, points = ladder
+    return points[bisect_left(thresholds, value)]
+
+def _first_matches(pattern: re.Pattern, text: str, limit: int = _MAX_ENTITY_MENTIONS) -> List[str]:
+    """Return up to limit matches, without scanning the text past the last one"""
+    return [match.group() for match in islice(pattern.finditer(text), limit)]
+
+@lru_cache(maxsize=200_000)
+def _count_syllables(word: str) -> int:
+    """Count syllables in a word (approximation); memoized since word frequencies are heavily skewed"""
+    word = word.lower()
+    
+    # Remove non-alphabetic characters
+    word = _NON_ALPHA_RE.sub('', word)
+    
+    if not word:
+        return 0
+    
+    # Count vowel groups: each consonant->vowel transition, plus a leading vowel
+    mask = word.translate(_SYLLABLE_MASK_TABLE)
+    count = mask.count('01') + (mask[0] == '1')
+    
+    # Adjust for silent 'e' at end
+    if word[-1] == 'e' and len(word) > 2 and mask[-2] == '0':
+        count -= 1
+    
+    # Ensure at least one syllable
+    return max(1, count)
+
+# Recommendation templates, stored as (priority, category, issue, recommendation,
+# implementation) tuples. Templates with placeholders are filled in by
+# _format_recommendation.
+_RECOMMENDATION_FIELDS = ("priority", "category", "issue", "recommendation", "implementation")
+
+def _format_recommendation(template: Tuple[str, ...], **values: Any) -> Tuple[str, ...]:
+    """Fill the placeholders of a recommendation template"""
+    return tuple(field.format(**values) for field in template)
+
+_REC_NO_SCHEMA = (
+    "high",
+    "schema",
+    "No Schema.org markup found",
+    "Implement JSON-LD Schema.org markup for your organization and main content types",
+    "Add a JSON-LD script with Organization schema to your homepage with essential properties like name, url, logo, and description",
+)
+_REC_LOW_QUALITY_SCHEMA = (
+    "high",
+    "schema",
+    "Low quality Schema.org implementation",
+    "Enhance existing Schema.org markup with more properties and better structure",
+    "Add missing properties to your schemas and ensure proper nesting of entities",
+)
+_REC_MISSING_ORGANIZATION_SCHEMA = (
+    "high",
+    "schema",
+    "Missing Organization schema",
+    "Add Organization or LocalBusiness schema to improve entity recognition in LLMs",
+    "Implement JSON-LD with your organization details including name, logo, url, description, and sameAs links to social profiles",
+)
+_REC_MISSING_CONTENT_TYPE_SCHEMA = (
+    "medium",
+    "schema",
+    "Missing content type schemas",
+    "Add appropriate schemas for your main content (Product, Article, HowTo, etc.)",
+    "Identify your primary content type and implement the corresponding Schema.org type with all required properties",
+)
+_REC_NO_FAQ_SCHEMA = (
+    "medium",
+    "schema",
+    "No FAQ content or schema",
+    "Add an FAQ section with FAQPage schema to improve LLM visibility and question answering",
+    "Create a list of common questions and answers about your products/services with FAQPage schema markup",
+)
+_REC_INCOMPLETE_SCHEMA = (
+    "medium",
+    "schema",
+    "Incomplete {schema_type} schema properties",
+    "Add missing properties to your {schema_type} schema",
+    "Enhance your {schema_type} schema with additional properties like description, image, and relevant dates",
+)
+_REC_MISSING_TITLE = (
+    "high",
+    "meta",
+    "Missing title tag",
+    "Add a descriptive title tag (50-65 characters) for better LLM understanding",
+    "Create a title that includes your brand name, primary keyword, and value proposition",
+)
+_REC_TITLE_LENGTH = (
+    "medium",
+    "meta",
+    "Suboptimal title length ({length} characters)",
+    "Adjust title length to 50-65 characters for optimal LLM visibility",
+    "Revise your title to be more descriptive and keyword-rich while staying within the recommended length",
+)
+_REC_UNSTRUCTURED_TITLE = (
+    "low",
+    "meta",
+    "Title lacks proper structure",
+    "Format title with brand name separator (e.g., 'Primary Keyword | Brand Name')",
+    "Restructure your title to follow the pattern 'Primary Content | Brand Name' for better LLM recognition",
+)
+_REC_MISSING_DESCRIPTION = (
+    "high",
+    "meta",
+    "Missing meta description",
+    "Add a descriptive meta description (140-170 characters) for LLM context understanding",
+    "Write a compelling description that summarizes your page content with relevant keywords and a call to action",
+)
+_REC_DESCRIPTION_LENGTH = (
+    "medium",
+    "meta",
+    "Suboptimal description length ({length} characters)",
+    "Adjust description length to 140-170 characters for optimal LLM visibility",
+    "Revise your description to be more informative and keyword-rich while staying within the recommended length",
+)
+_REC_LOW_QUALITY_DESCRIPTION = (
+    "medium",
+    "meta",
+    "Low-quality meta description",
+    "Improve meta description with more context and keywords",
+    "Enhance your description with specific details about your content, benefits, and relevant keywords",
+)
+_REC_MISSING_OPEN_GRAPH = (
+    "medium",
+    "meta",
+    "Missing Open Graph tags",
+    "Add Open Graph meta tags for better social sharing and LLM context",
+    "Implement og:title, og:description, og:image, og:url, and og:type tags",
+)
+_REC_MISSING_OG_IMAGE = (
+    "medium",
+    "meta",
+    "Missing og:image tag",
+    "Add og:image tag for visual representation in LLM training data",
+    "Add an og:image tag with a high-quality, relevant image (minimum 1200x630 pixels)",
+)
+_REC_MISSING_H1 = (
+    "high",
+    "content",
+    "Missing H1 heading",
+    "Add a single H1 heading that clearly describes your page content for LLM understanding",
+    "Create an H1 tag that includes your primary keyword and matches your title tag intent",
+)
+_REC_POOR_HEADING_HIERARCHY = (
+    "medium",
+    "content",
+    "Poor heading hierarchy",
+    "Improve heading structure with proper H1-H6 hierarchy for better LLM content parsing",
+    "Ensure headings follow a logical structure without skipping levels (e.g., H1 → H2 → H3)",
+)
+_REC_THIN_CONTENT = (
+    "high",
+    "content",
+    "Insufficient content length",
+    "Expand content to at least 500-800 words for better LLM visibility and context",
+    "Add more comprehensive information about your topic, addressing common questions and including relevant keywords",
+)
+_REC_NO_LISTS = (
+    "medium",
+    "content",
+    "No list elements found",
+    "Add bulleted or numbered lists to improve content structure for LLM parsing",
+    "Convert appropriate content sections into lists for better readability and structured data extraction by LLMs",
+)
+_REC_LOW_CONTENT_DIVERSITY = (
+    "medium",
+    "content",
+    "Low content diversity",
+    "Add more diverse content elements for better LLM understanding",
+    "Include a mix of paragraphs, lists, tables, images with alt text, and quotes to create richer content",
+)
+_REC_FEW_SEMANTIC_ELEMENTS = (
+    "medium",
+    "content",
+    "Limited use of semantic HTML elements",
+    "Add semantic HTML5 elements to improve content structure for LLMs",
+    "Use elements like <article>, <section>, <figure>, <figcaption>, and <aside> to better organize content",
+)
+_REC_NO_FAQ_SECTIONS = (
+    "medium",
+    "content",
+    "No FAQ sections found",
+    "Add an FAQ section to improve LLM visibility and question answering capabilities",
+    "Create a list of 5-10 common questions and detailed answers about your products/services, using proper HTML structure (dl/dt/dd or h3+p patterns)",
+)
+_REC_FEW_ENTITY_MENTIONS = (
+    "low",
+    "content",
+    "Limited entity mentions",
+    "Include more named entities in your content for better LLM context",
+    "Mention specific organizations, products, people, or locations relevant to your content",
+)
+_REC_MISSING_ALT_TEXT = (
+    "medium",
+    "content",
+    "Images missing alt text",
+    "Add descriptive alt text to all images for LLM context understanding",
+    "Write concise, descriptive alt text that explains the image content, context, and relevance to the topic",
+)
+_REC_FEW_STRUCTURED_PATTERNS = (
+    "medium",
+    "content",
+    "Limited structured content patterns",
+    "Add more structured content patterns for better LLM parsing",
+    "Include definition lists, tables with headers, blockquotes, or code samples where appropriate",
+)
+_REC_NO_SSL = (
+    "high",
+    "technical",
+    "SSL not enabled",
+    "Enable HTTPS for your website to improve LLM trust signals",
+    "Install an SSL certificate and configure your server to use HTTPS, which is a key trust signal for LLMs",
+)
+_REC_NOT_MOBILE_FRIENDLY = (
+    "high",
+    "technical",
+    "Not mobile-friendly",
+    "Implement responsive design for mobile devices to improve LLM visibility",
+    "Add viewport meta tag and ensure your CSS supports responsive layouts, as mobile-friendliness is a key quality signal for LLMs",
+)
+_REC_LARGE_PAGE = (
+    "medium",
+    "technical",
+    "Large page size ({page_size_kb:.1f} KB)",
+    "Optimize page size for faster loading and better LLM processing",
+    "Compress images, minify CSS/JS, and remove unnecessary resources to improve page performance",
+)
+_REC_NO_SITEMAP = (
+    "medium",
+    "technical",
+    "No sitemap.xml found",
+    "Add a sitemap.xml file for better indexing and LLM discovery",
+    "Generate a sitemap.xml file listing all important pages on your site with priority and change frequency",
+)
+_REC_INVALID_STRUCTURED_DATA = (
+    "high",
+    "technical",
+    "Invalid structured data",
+    "Fix structured data validation errors for better LLM understanding",
+    "Use Schema.org's validator or Google's Structured Data Testing Tool to identify and fix errors",
+)
+_REC_SLOW_LOAD_TIME = (
+    "medium",
+    "technical",
+    "Slow page load time",
+    "Improve page speed for better user experience and LLM crawling",
+    "Optimize server response time, enable caching, and reduce render-blocking resources",
+)
+
+def _first_incomplete_schema(audit_results: Dict) -> Optional[str]:
+    """First schema type that is less than 70% complete, if any"""
+    completeness = audit_results["schema_org"].get("completeness", {})
+    return next((schema_type for schema_type, score in completeness.items() if score < 0.7), None)
+
+def _lacks_entity_mentions(content: Dict) -> bool:
+    """Whether entity analysis ran and found no organizations or products"""
+    if "entity_mentions" not in content:
+        return False
+    entities = content.get("entity_mentions", {})
+    return not entities.get("organizations") and not entities.get("products")
+
+# Recommendation rules as (template, applies, values): applies(audit_results)
+# decides whether the template is added, and values(audit_results), for
+# templates with placeholders, returns what to fill them with. Listed in
+# check order; _RECOMMENDATION_RULES below is the same table sorted by priority.
+_RECOMMENDATION_RULE_DEFINITIONS = (
+    # Schema recommendations
+    (_REC_NO_SCHEMA, lambda audit: not audit["schema_org"]["found"], None),
+    (_REC_LOW_QUALITY_SCHEMA,
+     lambda audit: audit["schema_org"]["found"] and audit["schema_org"].get("quality_score", 0) < 50, None),
+    (_REC_MISSING_ORGANIZATION_SCHEMA,
+     lambda audit: audit["schema_org"]["found"] and not audit["schema_org"]["high_value_schemas"]["organization"],
+     None),
+    (_REC_MISSING_CONTENT_TYPE_SCHEMA,
+     lambda audit: (audit["schema_org"]["found"]
+                    and not audit["schema_org"]["high_value_schemas"]["product"]
+                    and not audit["schema_org"]["high_value_schemas"]["article"]
+                    and not audit["schema_org"]["high_value_schemas"].get("howto", False)),
+     None),
+    (_REC_NO_FAQ_SCHEMA,
+     lambda audit: (audit["schema_org"]["found"] and not audit["schema_org"]["high_value_schemas"]["faq"]
+                    and audit["content_structure"].get("faq_count", 0) == 0),
+     None),
+    (_REC_INCOMPLETE_SCHEMA,
+     lambda audit: audit["schema_org"]["found"] and _first_incomplete_schema(audit) is not None,
+     lambda audit: {"schema_type": _first_incomplete_schema(audit)}),
+    
+    # Meta tag recommendations
+    (_REC_MISSING_TITLE, lambda audit: not audit["meta_tags"]["title"], None),
+    (_REC_TITLE_LENGTH,
+     lambda audit: (audit["meta_tags"]["title"]
+                    and (audit["meta_tags"]["title_length"] < 30 or audit["meta_tags"]["title_length"] > 70)),
+     lambda audit: {"length": audit["meta_tags"]["title_length"]}),
+    (_REC_UNSTRUCTURED_TITLE,
+     lambda audit: audit["meta_tags"]["title"] and not _TITLE_SEPARATOR_RE.search(audit["meta_tags"]["title"]),
+     None),
+    (_REC_MISSING_DESCRIPTION, lambda audit: not audit["meta_tags"]["description"], None),
+    (_REC_DESCRIPTION_LENGTH,
+     lambda audit: (audit["meta_tags"]["description"]
+                    and (audit["meta_tags"]["description_length"] < 100
+                         or audit["meta_tags"]["description_length"] > 180)),
+     lambda audit: {"length": audit["meta_tags"]["description_length"]}),
+    (_REC_LOW_QUALITY_DESCRIPTION,
+     lambda audit: audit["meta_tags"]["description"] and len(audit["meta_tags"]["description"].split()) < 15,
+     None),
+    (_REC_MISSING_OPEN_GRAPH, lambda audit: not audit["meta_tags"]["og_tags"], None),
+    (_REC_MISSING_OG_IMAGE,
+     lambda audit: audit["meta_tags"]["og_tags"] and "og:image" not in audit["meta_tags"]["og_tags"], None),
+    
+    # Content structure recommendations
+    (_REC_MISSING_H1, lambda audit: audit["content_structure"]["headings"]["h1"] == 0, None),
+    (_REC_POOR_HEADING_HIERARCHY, lambda audit: audit["content_structure"]["heading_hierarchy_score"] < 0.7, None),
+    (_REC_THIN_CONTENT, lambda audit: audit["content_structure"]["word_count"] < 300, None),
+    (_REC_NO_LISTS, lambda audit: audit["content_structure"]["lists"] == 0, None),
+    (_REC_LOW_CONTENT_DIVERSITY,
+     lambda audit: ("content_diversity_score" in audit["content_structure"]
+                    and audit["content_structure"]["content_diversity_score"] < 0.5),
+     None),
+    (_REC_FEW_SEMANTIC_ELEMENTS,
+     lambda audit: ("semantic_elements" in audit["content_structure"]
+                    and len(audit["content_structure"].get("semantic_elements", {})) < 3),
+     None),
+    (_REC_NO_FAQ_SECTIONS, lambda audit: audit["content_structure"]["faq_count"] == 0, None),
+    (_REC_FEW_ENTITY_MENTIONS, lambda audit: _lacks_entity_mentions(audit["content_structure"]), None),
+    (_REC_MISSING_ALT_TEXT,
+     lambda audit: (audit["content_structure"]["images"] > 0
+                    and audit["content_structure"]["images_with_alt"] / audit["content_structure"]["images"] < 0.5),
+     None),
+    (_REC_FEW_STRUCTURED_PATTERNS,
+     lambda audit: ("structured_patterns" in audit["content_structure"]
+                    and not audit["content_structure"].get("structured_patterns", {})),
+     None),
+    
+    # Technical recommendations
+    (_REC_NO_SSL, lambda audit: not audit["technical_factors"]["ssl_enabled"], None),
+    (_REC_NOT_MOBILE_FRIENDLY, lambda audit: not audit["technical_factors"]["mobile_friendly"], None),
+    (_REC_LARGE_PAGE,
+     lambda audit: audit["technical_factors"]["page_size_kb"] > 2000,
+     lambda audit: {"page_size_kb": audit["technical_factors"]["page_size_kb"]}),
+    (_REC_NO_SITEMAP, lambda audit: not audit["technical_factors"].get("has_sitemap", False), None),
+    (_REC_INVALID_STRUCTURED_DATA,
+     lambda audit: not audit["technical_factors"].get("structured_data_valid", True), None),
+    (_REC_SLOW_LOAD_TIME, lambda audit: audit["technical_factors"].get("load_time_ms", 0) > 3000, None),
+)
+
+# The rules in output order (by priority, then check order) as
+# (applies, prebuilt dict, template, values); callers get copies of the dicts
+_RECOMMENDATION_RULES = tuple(
+    (applies, dict(zip(_RECOMMENDATION_FIELDS, template)), template, values)
+    for template, applies, values in sorted(
+        _RECOMMENDATION_RULE_DEFINITIONS,
+        key=lambda rule: RECOMMENDATION_PRIORITIES.index(rule[0][0])
+    )
+)
+
+def _new_session() -> requests.Session:
+    """Create a requests.Session with the crawler's headers"""
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (compatible; LLMO-Bot/1.0)',
+        # urllib3 only advertises "br" when the brotli decoder is installed
+        'Accept-Encoding': ACCEPT_ENCODING
+    })
+    return session
+
 class WebScraperService:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (compatible; LLMO-Bot/1.0)'
-        })
+        self.session = _new_session()
+        # Tag lists shared by the analyzers for the document being audited, as (soup, index)
+        self._tag_cache: Optional[Tuple[BeautifulSoup, Dict[str, Any]]] = None
+    
+    async def audit_batch(self, domains: List[str]) -> List[Dict]:
+        """
+        Audit several websites in parallel worker processes
+        
+        Parsing and analysis are CPU-bound and hold the GIL, so each domain
+        is audited in a separate process. Results are returned in the same
+        order as ``domains``.
+        """
+        loop = asyncio.get_running_loop()
+        pool = _get_process_pool()
+        
+        return await asyncio.gather(*(
+            loop.run_in_executor(pool, _audit_sync, domain) for domain in domains
+        ))
     
-    async def audit_website(self, domain: str) -> Dict:
-        """Perform comprehensive website audit for LLM visibility"""
+    async def audit_website(self, domain: str, bypass_cache: bool = False) -> Dict:
+        """
+        Perform comprehensive website audit for LLM visibility
+        
+        Recent host failures and analyses of an unchanged page are reused;
+        pass bypass_cache=True to fetch and analyze the page from scratch.
+        """
         if not domain.startswith(('http://', 'https://')):
             domain = f"https://{domain}"
         
+        # Don't pay the full timeout again for a host that just failed
+        host = urlparse(domain).netloc.lower()
+        cached_failure = None if bypass_cache else self._get_cached_failure(host)
+        if cached_failure:
+            logger.info(f"Skipping audit for recently failed host: {host}")
+            cached_failure["domain"] = domain
+            return cached_failure
+        
         try:
             logger.info(f"Starting website audit for domain: {domain}")
-            response = self.session.get(domain, timeout=10)
-            response.raise_for_status()
+            response = self.session.get(domain, timeout=10, stream=True)
+            try:
+                response.raise_for_status()
+                content = self._read_body(response)
+            finally:
+                response.close()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            encoding = self._declared_encoding(response)
+            # The body may have been truncated, so prefer the declared size
+            page_size = self._content_length(response)
+            if page_size is None:
+                page_size = len(content)
+            document_key = self._document_key(domain, encoding, content)
+            document = None if bypass_cache else self._get_cached_document(document_key)
+            if document is None:
+                soup = BeautifulSoup(content, 'lxml', from_encoding=encoding)
+                
+                # Perform comprehensive analysis
+                document = {
+                    "schema_org": self._analyze_schema_org(soup),
+                    "meta_tags": self._analyze_meta_tags(soup),
+                    "content_structure": self._analyze_content_structure(soup),
+                    "page_factors": self._analyze_page_factors(soup, domain)
+                }
+                self._cache_document(document_key, document)
+            else:
+                logger.info(f"Reusing analysis of unchanged page for {domain}")
             
-            # Perform comprehensive analysis
-            schema_analysis = self._analyze_schema_org(soup)
-            meta_analysis = self._analyze_meta_tags(soup)
-            content_analysis = self._analyze_content_structure(soup)
-            technical_analysis = self._analyze_technical_factors(soup, domain, response)
+            schema_analysis = document["schema_org"]
+            meta_analysis = document["meta_tags"]
+            content_analysis = document["content_structure"]
+            technical_analysis = self._analyze_technical_factors(
+                None, domain, response, page_size, document["page_factors"]
+            )
             
             # Combine all analyses
             audit_results = {
@@ -82,7 +669,7 @@ class WebScraperService:
             
         except requests.exceptions.ConnectionError as e:
             logger.error(f"Connection error for {domain}: {e}")
-            return {
+            result = {
                 "domain": domain,
                 "error": f"Connection error: {str(e)}",
                 "error_type": "connection_error",
@@ -94,9 +681,11 @@ class WebScraperService:
                     "recommendation": "Ensure your website is accessible and properly configured"
                 }]
             }
+            self._cache_failure(host, result, CONNECTION_FAILURE_TTL_SECONDS)
+            return result
         except requests.exceptions.Timeout as e:
             logger.error(f"Timeout error for {domain}: {e}")
-            return {
+            result = {
                 "domain": domain,
                 "error": f"Timeout error: {str(e)}",
                 "error_type": "timeout",
@@ -108,9 +697,11 @@ class WebScraperService:
                     "recommendation": "Improve website loading speed and server response time"
                 }]
             }
+            self._cache_failure(host, result, CONNECTION_FAILURE_TTL_SECONDS)
+            return result
         except requests.exceptions.HTTPError as e:
             logger.error(f"HTTP error for {domain}: {e}")
-            return {
+            result = {
                 "domain": domain,
                 "error": f"HTTP error: {str(e)}",
                 "error_type": "http_error",
@@ -123,6 +714,9 @@ class WebScraperService:
                     "recommendation": "Fix server configuration or page errors"
                 }]
             }
+            if isinstance(result["status_code"], int) and result["status_code"] >= 500:
+                self._cache_failure(host, result, SERVER_ERROR_TTL_SECONDS)
+            return result
         except Exception as e:
             logger.error(f"Unexpected error for {domain}: {e}")
             return {
@@ -137,6 +731,147 @@ class WebScraperService:
                     "recommendation": "Contact support for assistance with this website"
                 }]
             }
+        finally:
+            # The index holds the parsed page; don't keep it past the audit
+            self._tag_cache = None
+    
+    def _get_cached_failure(self, host: str) -> Optional[Dict]:
+        """Get a copy of the cached error result for a host, if it has not expired"""
+        entry = _negative_cache.get(host)
+        if entry is None:
+            return None
+        
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            _negative_cache.pop(host, None)
+            return None
+        
+        return copy.deepcopy(result)
+    
+    def _cache_failure(self, host: str, result: Dict, ttl_seconds: int) -> None:
+        """Remember a failed audit for a host for ttl_seconds"""
+        if len(_negative_cache) >= NEGATIVE_CACHE_MAX_ENTRIES:
+            now = time.monotonic()
+            for key in [k for k, (expires_at, _) in _negative_cache.items() if expires_at <= now]:
+                del _negative_cache[key]
+            
+            # Still full: drop the oldest entry
+            if len(_negative_cache) >= NEGATIVE_CACHE_MAX_ENTRIES:
+                _negative_cache.pop(next(iter(_negative_cache)))
+        
+        _negative_cache[host] = (time.monotonic() + ttl_seconds, copy.deepcopy(result))
+    
+    def _document_key(self, domain: str, encoding: Optional[str], content: bytes) -> bytes:
+        """Digest identifying a page body as fetched from a URL"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(domain.encode('utf-8', 'surrogatepass'))
+        digest.update(b'\0')
+        digest.update((encoding or '').encode('ascii', 'replace'))
+        digest.update(b'\0')
+        digest.update(content)
+        return digest.digest()
+    
+    def _get_cached_document(self, key: bytes) -> Optional[Dict]:
+        """Get a copy of the cached analyses for a page body, if any"""
+        document = _document_cache.get(key)
+        if document is None:
+            return None
+        
+        _document_cache.move_to_end(key)
+        return copy.deepcopy(document)
+    
+    def _cache_document(self, key: bytes, document: Dict) -> None:
+        """Remember the analyses of a page body, evicting the least recently used"""
+        _document_cache[key] = copy.deepcopy(document)
+        _document_cache.move_to_end(key)
+        if len(_document_cache) > DOCUMENT_CACHE_MAX_ENTRIES:
+            _document_cache.popitem(last=False)
+    
+    def _declared_encoding(self, response: requests.Response) -> Optional[str]:
+        """
+        Get the charset declared in the Content-Type header, if any
+        
+        Passing it to BeautifulSoup skips charset detection. requests falls
+        back to ISO-8859-1 for text/* without a charset, so response.encoding
+        is only trusted when the header actually names one.
+        """
+        content_type = response.headers.get('Content-Type', '')
+        if 'charset=' in content_type.lower():
+            return response.encoding
+        return None
+    
+    def _read_body(self, response: requests.Response) -> bytes:
+        """
+        Read a streamed response body, stopping at MAX_BODY_BYTES
+        
+        Content is decoded (gzip/deflate/br) by urllib3 as it streams,
+        so the cap applies to the HTML that will actually be parsed.
+        """
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= MAX_BODY_BYTES:
+                logger.warning(f"Response body for {response.url} truncated at {MAX_BODY_BYTES} bytes")
+                break
+        
+        return b''.join(chunks)[:MAX_BODY_BYTES]
+    
+    def _tag_index(self, soup: BeautifulSoup) -> Dict[str, Any]:
+        """
+        Get the head-level tags used by several analyzers
+        
+        Only the most recent document is indexed, and audit_website drops it
+        once the audit is done. The soup is compared by identity because
+        BeautifulSoup compares trees by their markup.
+        """
+        if self._tag_cache is not None and self._tag_cache[0] is soup:
+            return self._tag_cache[1]
+        
+        index = {
+            'title': soup.find('title'),
+            'meta': soup.find_all('meta'),
+            'link': soup.find_all('link'),
+            'script_ldjson': _JSONLD_SELECTOR.select(soup)
+        }
+        self._tag_cache = (soup, index)
+        return index
+    
+    def _extract_jsonld_texts(self, soup: BeautifulSoup) -> List[Optional[str]]:
+        """
+        Get the raw text of every JSON-LD script on the page
+        
+        Empty scripts give None, which parsing reports as an error. Results
+        are plain str since orjson rejects str subclasses.
+        """
+        return [
+            str(script.string) if script.string is not None else None
+            for script in self._tag_index(soup)['script_ldjson']
+        ]
+    
+    def _parse_jsonld(self, soup: BeautifulSoup) -> List[Tuple[Any, Optional[str]]]:
+        """
+        Parse every JSON-LD script on the page once
+        
+        Returns (data, error) pairs in document order, where error is a
+        message for scripts that are not valid JSON. The result is kept in
+        the per-document tag index so schema and FAQ analysis share it.
+        """
+        index = self._tag_index(soup)
+        parsed = index.get('jsonld')
+        if parsed is None:
+            parsed = []
+            for script_text in self._extract_jsonld_texts(soup):
+                try:
+                    parsed.append((orjson.loads(script_text), None))
+                except json.JSONDecodeError as e:
+                    parsed.append((None, f"Invalid JSON: {str(e)}"))
+                except Exception as e:
+                    parsed.append((None, f"Schema processing error: {str(e)}"))
+            index['jsonld'] = parsed
+        
+        return parsed
     
     def _analyze_schema_org(self, soup: BeautifulSoup) -> Dict:
         """
@@ -149,10 +884,10 @@ class WebScraperService:
         - Detection of high-value schemas for LLMs
         - Nested entity relationships
         """
-        schema_scripts = soup.find_all('script', type='application/ld+json')
+        parsed_scripts = self._parse_jsonld(soup)
         schemas = []
         schema_types = set()
-        schema_properties = {}
+        schema_properties = Counter()
         schema_errors = []
         schema_relationships = []
         schema_completeness = {}
@@ -174,23 +909,21 @@ class WebScraperService:
             'HowTo': ['name', 'step', 'tool', 'supply']
         }
         
-        for script in schema_scripts:
+        for schema_data, parse_error in parsed_scripts:
+            if parse_error:
+                schema_errors.append(parse_error)
+                continue
+            
             try:
-                schema_data = json.loads(script.string)
                 schemas.append(schema_data)
                 
                 # Extract schema types
                 schema_type = self._extract_schema_type(schema_data)
                 if schema_type:
-                    for t in schema_type.split(', '):
-                        schema_types.add(t)
+                    schema_types.update(schema_type.split(', '))
                 
                 # Extract and count properties
-                properties = self._extract_schema_properties(schema_data)
-                for prop, value in properties.items():
-                    if prop not in schema_properties:
-                        schema_properties[prop] = 0
-                    schema_properties[prop] += 1
+                schema_properties.update(self._extract_schema_properties(schema_data))
                 
                 # Analyze schema completeness
                 completeness = self._analyze_schema_completeness(schema_data, llm_valuable_schemas)
@@ -203,8 +936,6 @@ class WebScraperService:
                 relationships = self._extract_schema_relationships(schema_data)
                 schema_relationships.extend(relationships)
                     
-            except json.JSONDecodeError as e:
-                schema_errors.append(f"Invalid JSON: {str(e)}")
             except Exception as e:
                 schema_errors.append(f"Schema processing error: {str(e)}")
         
@@ -275,14 +1006,14 @@ class WebScraperService:
         
         return None
     
-    def _extract_schema_properties(self, schema_data: Any) -> Dict[str, int]:
+    def _extract_schema_properties(self, schema_data: Any) -> Set[str]:
         """
-        Extract and count Schema.org properties
+        Extract Schema.org property paths
         
         Recursively processes schema data to extract all properties,
         handling nested objects and arrays properly.
         """
-        properties = {}
+        properties = set()
         
         def process_dict(data, prefix=''):
             if not isinstance(data, dict):
@@ -293,7 +1024,7 @@ class WebScraperService:
                     continue
                     
                 prop_name = f"{prefix}{key}" if prefix else key
-                properties[prop_name] = 1
+                properties.add(prop_name)
                 
                 if isinstance(value, dict):
                     process_dict(value, f"{prop_name}.")
@@ -362,9 +1093,11 @@ class WebScraperService:
         """
         relationships = []
         entity_ids = {}  # Map of @id to entity type
+        nodes = []  # (entity, path) for every entity that can hold a reference
         
-        # First pass: collect all entity IDs
-        def collect_ids(entity, path=""):
+        # Single traversal: collect all entity IDs and the entities to scan for references.
+        # Keywords ("@...") are searched for IDs but their contents are not scanned.
+        def collect_ids(entity, path="", scan=True, skip_graph=False):
             if not isinstance(entity, dict):
                 return
                 
@@ -377,28 +1110,37 @@ class WebScraperService:
                     'path': path
                 }
             
+            if scan:
+                nodes.append((entity, path))
+            
             for key, value in entity.items():
+                if skip_graph and key == '@graph':
+                    continue
+                    
+                child_scan = scan and not key.startswith('@')
                 if isinstance(value, dict):
-                    collect_ids(value, f"{path}.{key}" if path else key)
+                    collect_ids(value, f"{path}.{key}" if path else key, child_scan)
                 elif isinstance(value, list):
                     for i, item in enumerate(value):
                         if isinstance(item, dict):
-                            collect_ids(item, f"{path}.{key}[{i}]" if path else f"{key}[{i}]")
+                            collect_ids(item, f"{path}.{key}[{i}]" if path else f"{key}[{i}]", child_scan)
         
-        # Second pass: find relationships
-        def find_relationships(entity, path=""):
-            if not isinstance(entity, dict):
-                return
-                
-            source_id = entity.get('@id')
+        # Process schema data
+        if isinstance(schema_data, dict):
+            # Graph items are walked as top-level entities below
+            has_graph = '@graph' in schema_data and isinstance(schema_data['@graph'], list)
+            collect_ids(schema_data, skip_graph=has_graph)
+            
+            if has_graph:
+                for item in schema_data['@graph']:
+                    collect_ids(item)
+        
+        # Find ID references now that every ID is known
+        for entity, path in nodes:
             source_type = entity.get('@type')
             
             for key, value in entity.items():
-                if key.startswith('@'):
-                    continue
-                    
-                # Check for ID references
-                if isinstance(value, str) and value in entity_ids:
+                if isinstance(value, str) and value in entity_ids and not key.startswith('@'):
                     target = entity_ids[value]
                     relationships.append({
                         'source_type': source_type,
@@ -407,25 +1149,6 @@ class WebScraperService:
                         'target_type': target['type'],
                         'target_path': target['path']
                     })
-                elif isinstance(value, dict):
-                    find_relationships(value, f"{path}.{key}" if path else key)
-                elif isinstance(value, list):
-                    for i, item in enumerate(value):
-                        if isinstance(item, dict):
-                            find_relationships(item, f"{path}.{key}[{i}]" if path else f"{key}[{i}]")
-        
-        # Process schema data
-        if isinstance(schema_data, dict):
-            collect_ids(schema_data)
-            find_relationships(schema_data)
-            
-            # Handle graph
-            if '@graph' in schema_data and isinstance(schema_data['@graph'], list):
-                for item in schema_data['@graph']:
-                    collect_ids(item)
-                
-                for item in schema_data['@graph']:
-                    find_relationships(item)
         
         return relationships
         
@@ -445,22 +1168,7 @@ class WebScraperService:
         score = 0
         
         # Score based on high-value schema types (max 40 points)
-        high_value_types = {
-            'Organization': 8,
-            'LocalBusiness': 8,
-            'Product': 8,
-            'FAQPage': 7,
-            'Article': 7,
-            'BreadcrumbList': 5,
-            'WebSite': 5,
-            'Person': 5,
-            'Review': 5,
-            'Event': 4,
-            'Recipe': 4,
-            'HowTo': 4
-        }
-        
-        type_score = sum(high_value_types.get(t, 1) for t in schema_types if t in high_value_types)
+        type_score = sum(_HIGH_VALUE_TYPES[t] for t in schema_types & _HIGH_VALUE_TYPE_KEYS)
         type_score = min(40, type_score)  # Cap at 40 points
         score += type_score
         
@@ -507,60 +1215,62 @@ class WebScraperService:
             "other_meta": {}
         }
         
-        # Title tag
-        title_tag = soup.find('title')
-        if title_tag and title_tag.text:
-            meta_analysis["title"] = title_tag.text.strip()
-            meta_analysis["title_length"] = len(meta_analysis["title"])
+        tags = self._tag_index(soup)
+        
+        # Single pass over <meta>: first tag per basic name, plus OG/Twitter/article/other tags
+        basic_tags = {}
+        for tag in tags['meta']:
+            name = tag.get('name')
+            prop = tag.get('property')
+            
+            if name in ('description', 'keywords', 'robots', 'viewport'):
+                basic_tags.setdefault(name, tag)
+            elif name and name.startswith('twitter:'):
+                meta_analysis["twitter_tags"][name] = tag.get('content')
+            elif name:
+                meta_analysis["other_meta"][name] = tag.get('content')
+            
+            if prop and prop.startswith('og:'):
+                meta_analysis["og_tags"][prop] = tag.get('content')
+            elif prop and prop.startswith('article:'):
+                meta_analysis["article_tags"][prop] = tag.get('content')
+        
+        # Title tag (.string reads the single text node; .get_text() only for mixed content)
+        title_tag = tags['title']
+        if title_tag:
+            title = title_tag.string
+            if title is None:
+                title = title_tag.get_text()
+            if title:
+                meta_analysis["title"] = title = title.strip()
+                meta_analysis["title_length"] = len(title)
         
         # Meta description
-        desc_tag = soup.find('meta', attrs={'name': 'description'})
-        if desc_tag and desc_tag.get('content'):
-            meta_analysis["description"] = desc_tag.get('content').strip()
-            meta_analysis["description_length"] = len(meta_analysis["description"])
+        desc_tag = basic_tags.get('description')
+        if desc_tag and (description := desc_tag.get('content')):
+            meta_analysis["description"] = description = description.strip()
+            meta_analysis["description_length"] = len(description)
         
         # Meta keywords
-        keywords_tag = soup.find('meta', attrs={'name': 'keywords'})
-        if keywords_tag and keywords_tag.get('content'):
-            meta_analysis["keywords"] = keywords_tag.get('content').strip()
+        keywords_tag = basic_tags.get('keywords')
+        if keywords_tag and (keywords := keywords_tag.get('content')):
+            meta_analysis["keywords"] = keywords.strip()
         
         # Canonical link
-        canonical_tag = soup.find('link', attrs={'rel': 'canonical'})
+        canonical_tag = next((link for link in tags['link'] if 'canonical' in (link.get('rel') or ())), None)
         if canonical_tag:
             meta_analysis["canonical"] = canonical_tag.get('href')
         
         # Robots meta
-        robots_tag = soup.find('meta', attrs={'name': 'robots'})
+        robots_tag = basic_tags.get('robots')
         if robots_tag:
             meta_analysis["robots"] = robots_tag.get('content')
         
         # Viewport meta
-        viewport_tag = soup.find('meta', attrs={'name': 'viewport'})
+        viewport_tag = basic_tags.get('viewport')
         if viewport_tag:
             meta_analysis["viewport"] = viewport_tag.get('content')
         
-        # Open Graph tags
-        og_tags = soup.find_all('meta', property=lambda x: x and x.startswith('og:'))
-        for tag in og_tags:
-            meta_analysis["og_tags"][tag.get('property')] = tag.get('content')
-        
-        # Twitter Card tags
-        twitter_tags = soup.find_all('meta', attrs={'name': lambda x: x and x.startswith('twitter:')})
-        for tag in twitter_tags:
-            meta_analysis["twitter_tags"][tag.get('name')] = tag.get('content')
-        
-        # Article tags
-        article_tags = soup.find_all('meta', property=lambda x: x and x.startswith('article:'))
-        for tag in article_tags:
-            meta_analysis["article_tags"][tag.get('property')] = tag.get('content')
-        
-        # Other meta tags
-        other_meta_tags = soup.find_all('meta')
-        for tag in other_meta_tags:
-            name = tag.get('name')
-            if name and name not in ['description', 'keywords', 'robots', 'viewport'] and not name.startswith('twitter:'):
-                meta_analysis["other_meta"][name] = tag.get('content')
-        
         # Calculate completeness scores
         meta_analysis["completeness"] = {
             "basic": self._calculate_basic_meta_completeness(meta_analysis),
@@ -591,17 +1301,10 @@ class WebScraperService:
             weight = 0.4
             total_weight += weight
             
-            # Ideal title length for LLMs: 50-60 chars
+            # Ideal title length for LLMs: 50-65 chars
             # Research shows LLMs prefer slightly longer titles than traditional SEO
             title_length = meta_analysis["title_length"]
-            if 50 <= title_length <= 65:  # Optimal for LLMs
-                score += weight
-            elif 40 <= title_length <= 75:  # Good for LLMs
-                score += weight * 0.8
-            elif 30 <= title_length <= 85:  # Acceptable for LLMs
-                score += weight * 0.6
-            else:
-                score += weight * 0.3
+            score += weight * _TITLE_SCORE_LUT[min(title_length, len(_TITLE_SCORE_LUT) - 1)]
             
             # Check for brand name in title (bonus)
             if "brand_name" in meta_analysis and meta_analysis["brand_name"]:
@@ -616,14 +1319,7 @@ class WebScraperService:
             # Ideal description length for LLMs: 140-170 chars
             # LLMs can process longer descriptions than traditional SEO limits
             desc_length = meta_analysis["description_length"]
-            if 140 <= desc_length <= 170:  # Optimal for LLMs
-                score += weight
-            elif 120 <= desc_length <= 190:  # Good for LLMs
-                score += weight * 0.8
-            elif 100 <= desc_length <= 220:  # Acceptable for LLMs
-                score += weight * 0.6
-            else:
-                score += weight * 0.3
+            score += weight * _DESCRIPTION_SCORE_LUT[min(desc_length, len(_DESCRIPTION_SCORE_LUT) - 1)]
             
             # Check for keyword presence in description
             if "keywords" in meta_analysis and meta_analysis["keywords"]:
@@ -743,16 +1439,18 @@ class WebScraperService:
         - Content richness and diversity
         - Readability and accessibility
         """
+        elements = self._element_index(soup)
+        tag_counts = elements['counts']
+        paragraphs = elements['p']
+        text = elements['text']
+        
         # Analyze headings
-        headings = {
-            f"h{i}": len(soup.find_all(f'h{i}')) for i in range(1, 7)
-        }
+        headings = {f"h{i}": tag_counts[f"h{i}"] for i in range(1, 7)}
         
         # Analyze heading hierarchy
-        heading_hierarchy_score = self._analyze_heading_hierarchy(soup)
+        heading_hierarchy_score = self._analyze_heading_hierarchy(soup, headings)
         
         # Analyze paragraphs directly (without main content extraction)
-        paragraphs = soup.find_all('p')
         paragraph_count = len(paragraphs)
         
         # Calculate average paragraph length
@@ -760,32 +1458,27 @@ class WebScraperService:
         avg_paragraph_length = sum(paragraph_lengths) / max(len(paragraph_lengths), 1)
         
         # Analyze lists
-        lists = soup.find_all(['ul', 'ol'])
-        list_count = len(lists)
-        
-        # Count list items
-        list_items = soup.find_all('li')
-        list_item_count = len(list_items)
+        list_count = tag_counts['ul'] + tag_counts['ol']
+        list_item_count = tag_counts['li']
         
         # Analyze tables
-        tables = soup.find_all('table')
-        table_count = len(tables)
+        table_count = tag_counts['table']
         
         # Detect FAQ sections
         faq_sections = self._detect_faq_sections(soup)
         
         # Analyze images with alt text
-        images = soup.find_all('img')
-        images_with_alt = sum(1 for img in images if img.get('alt'))
+        image_count = tag_counts['img']
+        images_with_alt = elements['images_with_alt']
         
         # Calculate word count
-        word_count = len(soup.get_text().split())
+        word_count = elements['word_count']
         
         # Analyze content readability
-        readability_score = self._calculate_readability(soup.get_text())
+        readability_score = self._calculate_readability(text)
         
         # Analyze keyword density
-        keyword_density = self._analyze_keyword_density(soup.get_text())
+        keyword_density = self._analyze_keyword_density(text)
         
         # Analyze semantic HTML5 elements (important for LLMs)
         semantic_elements = self._analyze_semantic_elements(soup)
@@ -796,11 +1489,11 @@ class WebScraperService:
         # Calculate content diversity score
         content_diversity_score = self._calculate_content_diversity(
             headings, paragraph_count, list_count, table_count, 
-            len(faq_sections), len(images), semantic_elements
+            len(faq_sections), image_count, semantic_elements
         )
         
         # Analyze entity mentions (people, places, organizations)
-        entity_mentions = self._analyze_entity_mentions(soup.get_text())
+        entity_mentions = self._analyze_entity_mentions(text)
         
         return {
             "headings": headings,
@@ -812,7 +1505,7 @@ class WebScraperService:
             "tables": table_count,
             "faq_sections": faq_sections,
             "faq_count": len(faq_sections),
-            "images": len(images),
+            "images": image_count,
             "images_with_alt": images_with_alt,
             "word_count": word_count,
             "readability_score": readability_score,
@@ -823,32 +1516,90 @@ class WebScraperService:
             "entity_mentions": entity_mentions
         }
     
-    def _analyze_heading_hierarchy(self, soup: BeautifulSoup) -> float:
-        """Analyze heading hierarchy for proper structure (0-1 score)"""
-        headings = []
-        for i in range(1, 7):
-            for h in soup.find_all(f'h{i}'):
-                headings.append((i, h.get_text().strip()))
-        
-        if not headings:
+    def _element_index(self, soup: BeautifulSoup) -> Dict[str, Any]:
+        """
+        Walk the document once for the body-level analyzers
+        
+        Counts every tag by name and accordion marker, keeps the paragraphs,
+        tables and figures that need a closer look, and collects the same text fragments
+        get_text() returns. The result is stored in the per-document tag
+        index, so content, semantic and pattern analysis share one walk.
+        """
+        index = self._tag_index(soup)
+        elements = index.get('elements')
+        if elements is None:
+            tag_counts = Counter()
+            kept = {name: [] for name in _INDEXED_ELEMENT_TAGS}
+            images_with_alt = 0
+            accordion_counts = [0] * (len(_ACCORDION_CLASSES) + 1)
+            text_parts = []
+            text_types = soup.interesting_string_types
+            for element in soup.descendants:
+                name = element.name
+                if name is None:
+                    if type(element) in text_types:
+                        text_parts.append(element)
+                    continue
+                
+                tag_counts[name] += 1
+                if name in kept:
+                    kept[name].append(element)
+                elif name == 'img' and element.attrs.get('alt'):
+                    images_with_alt += 1
+                
+                attrs = element.attrs
+                if attrs:
+                    classes = attrs.get('class')
+                    if classes:
+                        if isinstance(classes, str):
+                            classes = classes.split()
+                        for i, accordion_class in enumerate(_ACCORDION_CLASSES):
+                            if accordion_class in classes:
+                                accordion_counts[i] += 1
+                    if attrs.get('data-toggle') == 'collapse':
+                        accordion_counts[-1] += 1
+            
+            text = ''.join(text_parts)
+            elements = index['elements'] = {
+                'counts': tag_counts,
+                'images_with_alt': images_with_alt,
+                'accordions': tuple(accordion_counts),
+                'text': text,
+                'word_count': len(text.split()),
+                **kept
+            }
+        
+        return elements
+    
+    def _analyze_heading_hierarchy(self, soup: BeautifulSoup,
+                                   heading_counts: Optional[Dict[str, int]] = None) -> float:
+        """
+        Analyze heading hierarchy for proper structure (0-1 score)
+        
+        Headings are compared level by level, so only the per-level counts
+        matter; callers that already counted them can pass heading_counts.
+        """
+        if heading_counts is None:
+            heading_counts = Counter(h.name for h in soup.find_all(_HEADING_TAGS))
+        
+        levels = [i for i in range(1, 7) if heading_counts.get(f"h{i}")]
+        total_headings = sum(heading_counts.get(tag, 0) for tag in _HEADING_TAGS)
+        
+        if not levels:
             return 0
         
         # Check if H1 exists and is first
-        if not headings or headings[0][0] != 1:
+        if levels[0] != 1:
             return 0.3  # Penalize missing H1
         
-        # Check for sequential hierarchy (no skipping levels)
-        hierarchy_violations = 0
-        for i in range(1, len(headings)):
-            prev_level, _ = headings[i-1]
-            curr_level, _ = headings[i]
-            
-            # Skipping levels (e.g., H2 to H4)
-            if curr_level > prev_level and curr_level - prev_level > 1:
-                hierarchy_violations += 1
+        # Check for sequential hierarchy (no skipping levels, e.g. H2 to H4)
+        hierarchy_violations = sum(
+            1 for prev_level, curr_level in zip(levels, levels[1:])
+            if curr_level - prev_level > 1
+        )
         
         # Calculate score based on violations
-        violation_ratio = hierarchy_violations / len(headings)
+        violation_ratio = hierarchy_violations / total_headings
         hierarchy_score = max(0, 1 - violation_ratio)
         
         return hierarchy_score
@@ -858,18 +1609,28 @@ class WebScraperService:
         faq_sections = []
         
         # Method 1: Look for FAQ schema
-        schema_scripts = soup.find_all('script', type='application/ld+json')
-        for script in schema_scripts:
-            try:
-                schema_data = json.loads(script.string)
-                if self._is_faq_schema(schema_data):
-                    faq_sections.append({
-                        "type": "schema",
-                        "questions": self._extract_faq_questions(schema_data),
-                        "quality": "high"
-                    })
-            except:
-                continue
+        index = self._tag_index(soup)
+        if 'jsonld' in index:
+            schema_candidates = [data for data, parse_error in index['jsonld'] if parse_error is None]
+        else:
+            # Nothing has parsed this page's JSON-LD yet, so only parse the
+            # scripts that mention FAQPage at all
+            schema_candidates = []
+            for script_text in self._extract_jsonld_texts(soup):
+                if not script_text or '"FAQPage"' not in script_text:
+                    continue
+                try:
+                    schema_candidates.append(orjson.loads(script_text))
+                except orjson.JSONDecodeError:
+                    continue
+        
+        for schema_data in schema_candidates:
+            if self._is_faq_schema(schema_data):
+                faq_sections.append({
+                    "type": "schema",
+                    "questions": self._extract_faq_questions(schema_data),
+                    "quality": "high"
+                })
         
         # Method 2: Look for FAQ patterns in HTML structure
         # Common pattern: dt/dd pairs
@@ -894,8 +1655,10 @@ class WebScraperService:
                     })
         
         # Method 3: Look for heading patterns (e.g., "Q:" followed by "A:")
-        q_headings = soup.find_all(['h2', 'h3', 'h4', 'h5', 'h6', 'strong'], 
-                                  string=lambda s: s and re.match(r'^Q[:.)]|Question|FAQ', s, re.I))
+        q_headings = [
+            candidate for candidate in soup.find_all(_FAQ_HEADING_TAGS)
+            if (heading_text := candidate.string) and _FAQ_HEADING_RE.match(heading_text)
+        ]
         
         for q_heading in q_headings:
             question_text = q_heading.get_text().strip()
@@ -910,7 +1673,7 @@ class WebScraperService:
                     faq_sections.append({
                         "type": "heading_pattern",
                         "questions": [{
-                            "question": re.sub(r'^Q[:.)]|\s*', '', question_text).strip(),
+                            "question": _FAQ_PREFIX_RE.sub('', question_text).strip(),
                             "answer": answer_text
                         }],
                         "quality": "low"
@@ -983,25 +1746,42 @@ class WebScraperService:
         return questions
     
     def _calculate_readability(self, text: str) -> Dict:
-        """Calculate readability metrics for text"""
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
+        """
+        Calculate readability metrics for text
         
-        # Split into sentences
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
+        Results are cached by a digest of the text, since repeat audits and
+        pages sharing a template often produce the same body text.
+        """
+        encoded = text.encode('utf-8', 'surrogatepass')
+        if len(encoded) > READABILITY_CACHE_MAX_TEXT_BYTES:
+            return self._compute_readability(text)
+        
+        key = hashlib.blake2b(encoded, digest_size=16).digest()
+        cached = _readability_cache.get(key)
+        if cached is not None:
+            _readability_cache.move_to_end(key)
+            return dict(cached)
+        
+        readability = self._compute_readability(text)
+        _readability_cache[key] = readability
+        if len(_readability_cache) > READABILITY_CACHE_MAX_ENTRIES:
+            _readability_cache.popitem(last=False)
+        
+        return dict(readability)
+    
+    def _compute_readability(self, text: str) -> Dict:
+        """Compute readability metrics for text without caching"""
+        # Remove extra whitespace
+        text = _WHITESPACE_RE.sub(' ', text).strip()
         
-        # Count words
-        words = text.split()
-        word_count = len(words)
+        # Count sentences (runs of terminators leave empty pieces, which are skipped)
+        sentence_count = sum(1 for s in text.translate(_SENTENCE_END_TABLE).split('.') if s.strip())
         
-        # Count syllables (approximation)
-        syllable_count = 0
-        for word in words:
-            syllable_count += self._count_syllables(word)
+        # Count words; after normalization words are separated by exactly one space
+        word_count = text.count(' ') + 1 if text else 0
         
         # Calculate metrics
-        if not sentences or not words:
+        if not sentence_count or not word_count:
             return {
                 "flesch_kincaid_grade": 0,
                 "avg_sentence_length": 0,
@@ -1009,8 +1789,11 @@ class WebScraperService:
                 "avg_syllables_per_word": 0
             }
         
-        avg_sentence_length = word_count / len(sentences)
-        avg_word_length = sum(len(word) for word in words) / word_count
+        # Count syllables (approximation)
+        syllable_count = sum(map(_count_syllables, text.split(' ')))
+        
+        avg_sentence_length = word_count / sentence_count
+        avg_word_length = (len(text) - (word_count - 1)) / word_count
         avg_syllables_per_word = syllable_count / word_count
         
         # Flesch-Kincaid Grade Level
@@ -1025,59 +1808,26 @@ class WebScraperService:
     
     def _count_syllables(self, word: str) -> int:
         """Count syllables in a word (approximation)"""
-        word = word.lower()
-        
-        # Remove non-alphabetic characters
-        word = re.sub(r'[^a-z]', '', word)
-        
-        if not word:
-            return 0
-        
-        # Count vowel groups
-        vowels = "aeiouy"
-        count = 0
-        prev_is_vowel = False
-        
-        for char in word:
-            is_vowel = char in vowels
-            if is_vowel and not prev_is_vowel:
-                count += 1
-            prev_is_vowel = is_vowel
-        
-        # Adjust for silent 'e' at end
-        if word.endswith('e') and len(word) > 2 and word[-2] not in vowels:
-            count -= 1
-        
-        # Ensure at least one syllable
-        return max(1, count)
+        return _count_syllables(word)
     
     def _analyze_keyword_density(self, text: str) -> Dict[str, Any]:
         """Analyze keyword density in content"""
-        # Remove extra whitespace and convert to lowercase
-        text = re.sub(r'\s+', ' ', text).strip().lower()
-        
-        # Remove common stop words
-        stop_words = {
-            'the', 'and', 'a', 'an', 'in', 'on', 'at', 'to', 'for', 'of', 
-            'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
-            'this', 'that', 'these', 'those', 'it', 'its', 'from', 'as'
-        }
-        
-        # Split into words and remove stop words
-        words = [word for word in re.findall(r'\b\w+\b', text) if word not in stop_words]
-        
-        # Count word frequencies
-        word_freq = {}
-        for word in words:
-            if len(word) > 2:  # Ignore very short words
-                word_freq[word] = word_freq.get(word, 0) + 1
+        # Count every word in one C-level pass; stop words and very short
+        # words are then filtered per distinct word rather than per occurrence.
+        # Whitespace needs no normalizing since only \w runs are extracted.
+        all_words = Counter(_WORD_RE.findall(text.lower()))
+        
+        # Stop words are excluded from the total; short words still count
+        total_words = sum(count for word, count in all_words.items() if word not in STOP_WORDS)
+        word_freq = Counter({
+            word: count for word, count in all_words.items()
+            if len(word) > 2 and word not in STOP_WORDS
+        })
         
         # Get top keywords
-        sorted_keywords = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-        top_keywords = sorted_keywords[:10]
+        top_keywords = word_freq.most_common(10)
         
         # Calculate density
-        total_words = len(words)
         keyword_density = {
             word: {
                 'count': count,
@@ -1092,67 +1842,124 @@ class WebScraperService:
             "unique_words": len(word_freq)
         }
     
-    def _analyze_technical_factors(self, soup: BeautifulSoup, domain: str, response: requests.Response) -> Dict:
-        """Analyze technical factors affecting LLM visibility"""
+    def _analyze_technical_factors(self, soup: Optional[BeautifulSoup], domain: str, response: requests.Response,
+                                   page_size: Optional[int] = None,
+                                   page_factors: Optional[Dict] = None) -> Dict:
+        """
+        Analyze technical factors affecting LLM visibility
+        
+        page_size is the byte count the caller already has (Content-Length,
+        or the streamed body, which stops at MAX_BODY_BYTES). Without it the
+        Content-Length header is used, and only as a last resort is the
+        body materialized through response.content. page_factors are the
+        results of _analyze_page_factors, for callers that already have them;
+        soup is only read when they are not given.
+        """
+        if page_size is None:
+            page_size = self._content_length(response)
+        if page_size is None:
+            page_size = len(response.content)
+        
+        # Probe sitemap.xml and robots.txt concurrently while the page is analyzed
+        probe_pool = _get_probe_pool()
+        sitemap_future = probe_pool.submit(self._url_exists, urljoin(domain, '/sitemap.xml'))
+        robots_future = probe_pool.submit(self._url_exists, urljoin(domain, '/robots.txt'))
+        
         technical_factors = {
-            "page_size_kb": len(response.content) / 1024,
+            "page_size_kb": page_size / 1024,
             "load_time_ms": response.elapsed.total_seconds() * 1000,
             "ssl_enabled": domain.startswith('https://'),
-            "mobile_friendly": self._check_mobile_friendly(soup),
+            "mobile_friendly": False,  # Filled in from the page factors below
             "structured_data_valid": True,  # Assume valid unless errors found
-            "has_sitemap": False,  # Will check below
-            "has_robots_txt": False,  # Will check below
+            "has_sitemap": False,  # Resolved from the probe below
+            "has_robots_txt": False,  # Resolved from the probe below
             "internal_links": 0,
             "external_links": 0,
             "broken_links": []
         }
         
-        # Check for sitemap
-        try:
-            sitemap_url = urljoin(domain, '/sitemap.xml')
-            sitemap_response = self.session.head(sitemap_url, timeout=5)
-            technical_factors["has_sitemap"] = sitemap_response.status_code == 200
-        except:
-            pass
+        if page_factors is None:
+            page_factors = self._analyze_page_factors(soup, domain)
+        technical_factors.update(page_factors)
         
-        # Check for robots.txt
-        try:
-            robots_url = urljoin(domain, '/robots.txt')
-            robots_response = self.session.head(robots_url, timeout=5)
-            technical_factors["has_robots_txt"] = robots_response.status_code == 200
-        except:
-            pass
+        # Check for sitemap and robots.txt
+        technical_factors["has_sitemap"] = sitemap_future.result()
+        technical_factors["has_robots_txt"] = robots_future.result()
+        
+        return technical_factors
+    
+    def _analyze_page_factors(self, soup: BeautifulSoup, domain: str) -> Dict:
+        """
+        Analyze the technical factors that depend only on the page markup
         
-        # Count internal and external links
+        Returns mobile_friendly, internal_links and external_links.
+        """
+        # Count internal and external links; navigation repeats the same
+        # hrefs, so each distinct href is classified once
         base_domain = urlparse(domain).netloc
-        links = soup.find_all('a', href=True)
+        href_counts = Counter(link['href'] for link in soup.find_all('a', href=True))
         
         internal_links = 0
         external_links = 0
         
-        for link in links:
-            href = link['href']
-            if not href or href.startswith('#') or href.startswith('javascript:'):
-                continue
-                
-            try:
-                parsed_url = urlparse(href)
-                if not parsed_url.netloc or parsed_url.netloc == base_domain:
-                    internal_links += 1
-                else:
-                    external_links += 1
-            except:
+        for href, count in href_counts.items():
+            is_internal = self._is_internal_link(href, base_domain)
+            if is_internal is None:
                 continue
+            if is_internal:
+                internal_links += count
+            else:
+                external_links += count
+        
+        return {
+            "mobile_friendly": self._check_mobile_friendly(soup),
+            "internal_links": internal_links,
+            "external_links": external_links
+        }
+    
+    def _is_internal_link(self, href: str, base_domain: str) -> Optional[bool]:
+        """Classify an href as internal (True) or external (False); None for non-page or malformed targets"""
+        if not href or href.startswith(_SKIPPED_HREF_PREFIXES):
+            return None
         
-        technical_factors["internal_links"] = internal_links
-        technical_factors["external_links"] = external_links
+        # Root-relative paths are internal without parsing
+        if href[0] == '/' and not href.startswith('//'):
+            return True
         
-        return technical_factors
+        try:
+            netloc = urlsplit(href).netloc
+        except ValueError:
+            return None
+        
+        return not netloc or netloc == base_domain
+    
+    def _content_length(self, response: requests.Response) -> Optional[int]:
+        """Get the declared Content-Length, or None if it is missing or malformed"""
+        try:
+            content_length = int(response.headers.get('Content-Length', ''))
+        except (TypeError, ValueError):
+            return None
+        
+        return content_length if content_length >= 0 else None
+    
+    def _url_exists(self, url: str) -> bool:
+        """
+        HEAD a URL and report whether it answered 200; network errors count as missing
+        
+        Runs on the probe pool, so it uses the calling thread's session
+        rather than self.session, which the audit itself is using.
+        """
+        try:
+            return _probe_session().head(url, timeout=5).status_code == 200
+        except Exception:
+            return False
     
     def _check_mobile_friendly(self, soup: BeautifulSoup) -> bool:
         """Check if page appears mobile-friendly"""
+        tags = self._tag_index(soup)
+        
         # Check for viewport meta tag
-        viewport = soup.find('meta', attrs={'name': 'viewport'})
+        viewport = next((meta for meta in tags['meta'] if meta.get('name') == 'viewport'), None)
         if not viewport or 'width=device-width' not in viewport.get('content', ''):
             return False
         
@@ -1163,7 +1970,10 @@ class WebScraperService:
                 return True
         
         # Check for media attributes in link tags
-        responsive_css = soup.find_all('link', attrs={'rel': 'stylesheet', 'media': True})
+        responsive_css = [
+            link for link in tags['link']
+            if 'stylesheet' in (link.get('rel') or ()) and link.get('media') is not None
+        ]
         for css in responsive_css:
             if 'screen' in css.get('media', ''):
                 return True
@@ -1180,12 +1990,7 @@ class WebScraperService:
             score += 15
             
             # Additional points for multiple schemas
-            if schema_analysis["count"] >= 3:
-                score += 15
-            elif schema_analysis["count"] == 2:
-                score += 10
-            else:
-                score += 5
+            score += _at_least_points(_SCHEMA_COUNT_LADDER, schema_analysis["count"])
         
         # High-value schemas (40 points)
         high_value = schema_analysis["high_value_schemas"]
@@ -1201,17 +2006,7 @@ class WebScraperService:
             score += 5
         
         # Schema property richness (30 points)
-        property_count = schema_analysis["property_count"]
-        if property_count >= 20:
-            score += 30
-        elif property_count >= 15:
-            score += 25
-        elif property_count >= 10:
-            score += 20
-        elif property_count >= 5:
-            score += 10
-        elif property_count > 0:
-            score += 5
+        score += _at_least_points(_PROPERTY_COUNT_LADDER, schema_analysis["property_count"])
         
         return min(score, 100)
     
@@ -1230,26 +2025,12 @@ class WebScraperService:
         # Title quality (10 points)
         if meta_analysis["title"]:
             title_length = meta_analysis["title_length"]
-            if 50 <= title_length <= 60:
-                score += 10
-            elif 40 <= title_length <= 70:
-                score += 7
-            elif 30 <= title_length <= 80:
-                score += 5
-            else:
-                score += 2
+            score += _TITLE_POINTS_LUT[min(title_length, len(_TITLE_POINTS_LUT) - 1)]
         
         # Description quality (10 points)
         if meta_analysis["description"]:
             desc_length = meta_analysis["description_length"]
-            if 140 <= desc_length <= 160:
-                score += 10
-            elif 120 <= desc_length <= 180:
-                score += 7
-            elif 100 <= desc_length <= 200:
-                score += 5
-            else:
-                score += 2
+            score += _DESCRIPTION_POINTS_LUT[min(desc_length, len(_DESCRIPTION_POINTS_LUT) - 1)]
         
         return min(score, 100)
     
@@ -1266,38 +2047,17 @@ class WebScraperService:
             score += int(hierarchy_score * 15)
         
         # Content length (20 points)
-        word_count = content_analysis["word_count"]
-        if word_count >= 1500:
-            score += 20
-        elif word_count >= 1000:
-            score += 15
-        elif word_count >= 500:
-            score += 10
-        elif word_count >= 300:
-            score += 5
+        score += _at_least_points(_WORD_COUNT_LADDER, content_analysis["word_count"])
         
         # Lists and structured content (20 points)
-        if content_analysis["lists"] >= 3:
-            score += 10
-        elif content_analysis["lists"] > 0:
-            score += 5
-        
-        if content_analysis["list_items"] >= 10:
-            score += 5
-        elif content_analysis["list_items"] > 0:
-            score += 2
+        score += _at_least_points(_LIST_COUNT_LADDER, content_analysis["lists"])
+        score += _at_least_points(_LIST_ITEM_LADDER, content_analysis["list_items"])
         
         if content_analysis["tables"] > 0:
             score += 5
         
         # FAQ sections (20 points)
-        faq_count = content_analysis["faq_count"]
-        if faq_count >= 3:
-            score += 20
-        elif faq_count == 2:
-            score += 15
-        elif faq_count == 1:
-            score += 10
+        score += _at_least_points(_FAQ_COUNT_LADDER, content_analysis["faq_count"])
         
         # Image optimization (10 points)
         images = content_analysis["images"]
@@ -1333,24 +2093,10 @@ class WebScraperService:
         load_time_ms = technical_analysis["load_time_ms"]
         
         # Size score (10 points)
-        if page_size_kb <= 500:
-            score += 10
-        elif page_size_kb <= 1000:
-            score += 7
-        elif page_size_kb <= 2000:
-            score += 5
-        elif page_size_kb <= 3000:
-            score += 2
+        score += _at_most_points(_PAGE_SIZE_KB_LADDER, page_size_kb)
         
         # Load time score (10 points)
-        if load_time_ms <= 500:
-            score += 10
-        elif load_time_ms <= 1000:
-            score += 7
-        elif load_time_ms <= 2000:
-            score += 5
-        elif load_time_ms <= 3000:
-            score += 2
+        score += _at_most_points(_LOAD_TIME_MS_LADDER, load_time_ms)
         
         # Sitemap and robots.txt (20 points)
         if technical_analysis["has_sitemap"]:
@@ -1363,22 +2109,10 @@ class WebScraperService:
         external_links = technical_analysis["external_links"]
         
         # Internal links score (10 points)
-        if internal_links >= 20:
-            score += 10
-        elif internal_links >= 10:
-            score += 7
-        elif internal_links >= 5:
-            score += 5
-        elif internal_links > 0:
-            score += 2
+        score += _at_least_points(_INTERNAL_LINK_LADDER, internal_links)
         
         # External links score (10 points)
-        if external_links >= 5:
-            score += 10
-        elif external_links >= 3:
-            score += 7
-        elif external_links >= 1:
-            score += 5
+        score += _at_least_points(_EXTERNAL_LINK_LADDER, external_links)
         
         return min(score, 100)
     
@@ -1447,366 +2181,18 @@ class WebScraperService:
         - Implementation guidance
         """
         recommendations = []
-        
-        # Schema recommendations
-        schema_org = audit_results["schema_org"]
-        if not schema_org["found"]:
-            recommendations.append({
-                "priority": "high",
-                "category": "schema",
-                "issue": "No Schema.org markup found",
-                "recommendation": "Implement JSON-LD Schema.org markup for your organization and main content types",
-                "implementation": "Add a JSON-LD script with Organization schema to your homepage with essential properties like name, url, logo, and description"
-            })
-        else:
-            high_value = schema_org["high_value_schemas"]
-            
-            # Check for schema quality score if available
-            schema_quality = schema_org.get("quality_score", 0)
-            if schema_quality < 50 and schema_org["found"]:
-                recommendations.append({
-                    "priority": "high",
-                    "category": "schema",
-                    "issue": "Low quality Schema.org implementation",
-                    "recommendation": "Enhance existing Schema.org markup with more properties and better structure",
-                    "implementation": "Add missing properties to your schemas and ensure proper nesting of entities"
-                })
-            
-            if not high_value["organization"]:
-                recommendations.append({
-                    "priority": "high",
-                    "category": "schema",
-                    "issue": "Missing Organization schema",
-                    "recommendation": "Add Organization or LocalBusiness schema to improve entity recognition in LLMs",
-                    "implementation": "Implement JSON-LD with your organization details including name, logo, url, description, and sameAs links to social profiles"
-                })
-            
-            if not high_value["product"] and not high_value["article"] and not high_value.get("howto", False):
-                recommendations.append({
-                    "priority": "medium",
-                    "category": "schema",
-                    "issue": "Missing content type schemas",
-                    "recommendation": "Add appropriate schemas for your main content (Product, Article, HowTo, etc.)",
-                    "implementation": "Identify your primary content type and implement the corresponding Schema.org type with all required properties"
-                })
-            
-            if not high_value["faq"] and audit_results["content_structure"].get("faq_count", 0) == 0:
-                recommendations.append({
-                    "priority": "medium",
-                    "category": "schema",
-                    "issue": "No FAQ content or schema",
-                    "recommendation": "Add an FAQ section with FAQPage schema to improve LLM visibility and question answering",
-                    "implementation": "Create a list of common questions and answers about your products/services with FAQPage schema markup"
-                })
-                
-            # Check for schema completeness if available
-            completeness = schema_org.get("completeness", {})
-            for schema_type, score in completeness.items():
-                if score < 0.7:  # Less than 70% complete
-                    recommendations.append({
-                        "priority": "medium",
-                        "category": "schema",
-                        "issue": f"Incomplete {schema_type} schema properties",
-                        "recommendation": f"Add missing properties to your {schema_type} schema",
-                        "implementation": f"Enhance your {schema_type} schema with additional properties like description, image, and relevant dates"
-                    })
-                    break  # Only add one recommendation for incomplete schemas
-        
-        # Meta tag recommendations
-        meta_tags = audit_results["meta_tags"]
-        
-        if not meta_tags["title"]:
-            recommendations.append({
-                "priority": "high",
-                "category": "meta",
-                "issue": "Missing title tag",
-                "recommendation": "Add a descriptive title tag (50-65 characters) for better LLM understanding",
-                "implementation": "Create a title that includes your brand name, primary keyword, and value proposition"
-            })
-        elif meta_tags["title_length"] < 30 or meta_tags["title_length"] > 70:
-            recommendations.append({
-                "priority": "medium",
-                "category": "meta",
-                "issue": f"Suboptimal title length ({meta_tags['title_length']} characters)",
-                "recommendation": "Adjust title length to 50-65 characters for optimal LLM visibility",
-                "implementation": "Revise your title to be more descriptive and keyword-rich while staying within the recommended length"
-            })
-            
-        # Check title format and structure
-        if meta_tags["title"] and not re.search(r'\s[\|\-\–\—]\s', meta_tags["title"]):
-            recommendations.append({
-                "priority": "low",
-                "category": "meta",
-                "issue": "Title lacks proper structure",
-                "recommendation": "Format title with brand name separator (e.g., 'Primary Keyword | Brand Name')",
-                "implementation": "Restructure your title to follow the pattern 'Primary Content | Brand Name' for better LLM recognition"
-            })
-        
-        if not meta_tags["description"]:
-            recommendations.append({
-                "priority": "high",
-                "category": "meta",
-                "issue": "Missing meta description",
-                "recommendation": "Add a descriptive meta description (140-170 characters) for LLM context understanding",
-                "implementation": "Write a compelling description that summarizes your page content with relevant keywords and a call to action"
-            })
-        elif meta_tags["description_length"] < 100 or meta_tags["description_length"] > 180:
-            recommendations.append({
-                "priority": "medium",
-                "category": "meta",
-                "issue": f"Suboptimal description length ({meta_tags['description_length']} characters)",
-                "recommendation": "Adjust description length to 140-170 characters for optimal LLM visibility",
-                "implementation": "Revise your description to be more informative and keyword-rich while staying within the recommended length"
-            })
-        
-        # Check description quality
-        if meta_tags["description"] and len(meta_tags["description"].split()) < 15:
-            recommendations.append({
-                "priority": "medium",
-                "category": "meta",
-                "issue": "Low-quality meta description",
-                "recommendation": "Improve meta description with more context and keywords",
-                "implementation": "Enhance your description with specific details about your content, benefits, and relevant keywords"
-            })
-        
-        # Open Graph recommendations
-        if not meta_tags["og_tags"]:
-            recommendations.append({
-                "priority": "medium",
-                "category": "meta",
-                "issue": "Missing Open Graph tags",
-                "recommendation": "Add Open Graph meta tags for better social sharing and LLM context",
-                "implementation": "Implement og:title, og:description, og:image, og:url, and og:type tags"
-            })
-        elif "og:image" not in meta_tags["og_tags"]:
-            recommendations.append({
-                "priority": "medium",
-                "category": "meta",
-                "issue": "Missing og:image tag",
-                "recommendation": "Add og:image tag for visual representation in LLM training data",
-                "implementation": "Add an og:image tag with a high-quality, relevant image (minimum 1200x630 pixels)"
-            })
-        
-        # Content structure recommendations
-        content = audit_results["content_structure"]
-        
-        if content["headings"]["h1"] == 0:
-            recommendations.append({
-                "priority": "high",
-                "category": "content",
-                "issue": "Missing H1 heading",
-                "recommendation": "Add a single H1 heading that clearly describes your page content for LLM understanding",
-                "implementation": "Create an H1 tag that includes your primary keyword and matches your title tag intent"
-            })
-        
-        if content["heading_hierarchy_score"] < 0.7:
-            recommendations.append({
-                "priority": "medium",
-                "category": "content",
-                "issue": "Poor heading hierarchy",
-                "recommendation": "Improve heading structure with proper H1-H6 hierarchy for better LLM content parsing",
-                "implementation": "Ensure headings follow a logical structure without skipping levels (e.g., H1 → H2 → H3)"
-            })
-        
-        if content["word_count"] < 300:
-            recommendations.append({
-                "priority": "high",
-                "category": "content",
-                "issue": "Insufficient content length",
-                "recommendation": "Expand content to at least 500-800 words for better LLM visibility and context",
-                "implementation": "Add more comprehensive information about your topic, addressing common questions and including relevant keywords"
-            })
-        
-        if content["lists"] == 0:
-            recommendations.append({
-                "priority": "medium",
-                "category": "content",
-                "issue": "No list elements found",
-                "recommendation": "Add bulleted or numbered lists to improve content structure for LLM parsing",
-                "implementation": "Convert appropriate content sections into lists for better readability and structured data extraction by LLMs"
-            })
-            
-        # Check for content diversity
-        if "content_diversity_score" in content and content["content_diversity_score"] < 0.5:
-            recommendations.append({
-                "priority": "medium",
-                "category": "content",
-                "issue": "Low content diversity",
-                "recommendation": "Add more diverse content elements for better LLM understanding",
-                "implementation": "Include a mix of paragraphs, lists, tables, images with alt text, and quotes to create richer content"
-            })
-            
-        # Check for semantic HTML elements
-        if "semantic_elements" in content and len(content.get("semantic_elements", {})) < 3:
-            recommendations.append({
-                "priority": "medium",
-                "category": "content",
-                "issue": "Limited use of semantic HTML elements",
-                "recommendation": "Add semantic HTML5 elements to improve content structure for LLMs",
-                "implementation": "Use elements like <article>, <section>, <figure>, <figcaption>, and <aside> to better organize content"
-            })
-        
-        if content["faq_count"] == 0:
-            recommendations.append({
-                "priority": "medium",
-                "category": "content",
-                "issue": "No FAQ sections found",
-                "recommendation": "Add an FAQ section to improve LLM visibility and question answering capabilities",
-                "implementation": "Create a list of 5-10 common questions and detailed answers about your products/services, using proper HTML structure (dl/dt/dd or h3+p patterns)"
-            })
-        
-        # Check for entity mentions
-        if "entity_mentions" in content:
-            entities = content.get("entity_mentions", {})
-            if not entities.get("organizations") and not entities.get("products"):
-                recommendations.append({
-                    "priority": "low",
-                    "category": "content",
-                    "issue": "Limited entity mentions",
-                    "recommendation": "Include more named entities in your content for better LLM context",
-                    "implementation": "Mention specific organizations, products, people, or locations relevant to your content"
-                })
-        
-        if content["images"] > 0 and content["images_with_alt"] / content["images"] < 0.5:
-            recommendations.append({
-                "priority": "medium",
-                "category": "content",
-                "issue": "Images missing alt text",
-                "recommendation": "Add descriptive alt text to all images for LLM context understanding",
-                "implementation": "Write concise, descriptive alt text that explains the image content, context, and relevance to the topic"
-            })
-            
-        # Check for structured patterns
-        if "structured_patterns" in content:
-            patterns = content.get("structured_patterns", {})
-            if not patterns:
-                recommendations.append({
-                    "priority": "medium",
-                    "category": "content",
-                    "issue": "Limited structured content patterns",
-                    "recommendation": "Add more structured content patterns for better LLM parsing",
-                    "implementation": "Include definition lists, tables with headers, blockquotes, or code samples where appropriate"
-                })
-        
-        # Technical recommendations
-        technical = audit_results["technical_factors"]
-        
-        if not technical["ssl_enabled"]:
-            recommendations.append({
-                "priority": "high",
-                "category": "technical",
-                "issue": "SSL not enabled",
-                "recommendation": "Enable HTTPS for your website to improve LLM trust signals",
-                "implementation": "Install an SSL certificate and configure your server to use HTTPS, which is a key trust signal for LLMs"
-            })
-        
-        if not technical["mobile_friendly"]:
-            recommendations.append({
-                "priority": "high",
-                "category": "technical",
-                "issue": "Not mobile-friendly",
-                "recommendation": "Implement responsive design for mobile devices to improve LLM visibility",
-                "implementation": "Add viewport meta tag and ensure your CSS supports responsive layouts, as mobile-friendliness is a key quality signal for LLMs"
-            })
-        
-        if technical["page_size_kb"] > 2000:
-            recommendations.append({
-                "priority": "medium",
-                "category": "technical",
-                "issue": f"Large page size ({technical['page_size_kb']:.1f} KB)",
-                "recommendation": "Optimize page size for faster loading and better LLM processing",
-                "implementation": "Compress images, minify CSS/JS, and remove unnecessary resources to improve page performance"
-            })
-        
-        if not technical.get("has_sitemap", False):
-            recommendations.append({
-                "priority": "medium",
-                "category": "technical",
-                "issue": "No sitemap.xml found",
-                "recommendation": "Add a sitemap.xml file for better indexing and LLM discovery",
-                "implementation": "Generate a sitemap.xml file listing all important pages on your site with priority and change frequency"
-            })
-            
-        if not technical.get("structured_data_valid", True):
-            recommendations.append({
-                "priority": "high",
-                "category": "technical",
-                "issue": "Invalid structured data",
-                "recommendation": "Fix structured data validation errors for better LLM understanding",
-                "implementation": "Use Schema.org's validator or Google's Structured Data Testing Tool to identify and fix errors"
-            })
-            
-        if technical.get("load_time_ms", 0) > 3000:
-            recommendations.append({
-                "priority": "medium",
-                "category": "technical",
-                "issue": "Slow page load time",
-                "recommendation": "Improve page speed for better user experience and LLM crawling",
-                "implementation": "Optimize server response time, enable caching, and reduce render-blocking resources"
-            })
-        
-        # Sort recommendations by priority
-        priority_order = {"high": 0, "medium": 1, "low": 2}
-        recommendations.sort(key=lambda x: priority_order[x["priority"]])
-        
-        return recommendations
-        """
-        Extract the main content area of the page
-        
-        Attempts to identify the main content section by looking for
-        semantic HTML5 elements and content density patterns.
-        """
-        # Try to find main content using semantic HTML5 elements
-        main_candidates = []
-        
-        # Check for <main> element
-        main_element = soup.find('main')
-        if main_element:
-            main_candidates.append((main_element, 10))  # High priority
-        
-        # Check for <article> elements
-        article_elements = soup.find_all('article')
-        for article in article_elements:
-            main_candidates.append((article, 8))
-        
-        # Check for content divs with common IDs/classes
-        content_selectors = [
-            'div#content', 'div#main', 'div#main-content', 
-            'div.content', 'div.main', 'div.main-content',
-            'div#post', 'div.post', 'div#entry', 'div.entry'
-        ]
-        
-        for selector in content_selectors:
-            try:
-                element = soup.select_one(selector)
-                if element:
-                    main_candidates.append((element, 6))
-            except:
+        for applies, recommendation, template, values in _RECOMMENDATION_RULES:
+            if not applies(audit_results):
                 continue
+            if values is None:
+                recommendations.append(recommendation.copy())
+            else:
+                recommendations.append(dict(zip(
+                    _RECOMMENDATION_FIELDS, _format_recommendation(template, **values(audit_results))
+                )))
         
-        # If no candidates found, look for the div with most content
-        if not main_candidates:
-            divs = soup.find_all('div')
-            for div in divs:
-                # Skip very small divs
-                if len(div.get_text(strip=True)) < 200:
-                    continue
-                
-                # Calculate content density (text / total HTML)
-                text_length = len(div.get_text(strip=True))
-                html_length = len(str(div))
-                if html_length > 0:
-                    density = text_length / html_length
-                    # Only consider divs with reasonable density
-                    if density > 0.2:
-                        main_candidates.append((div, density * 5))
-        
-        # Return the best candidate or the original soup if none found
-        if main_candidates:
-            main_candidates.sort(key=lambda x: x[1], reverse=True)
-            return main_candidates[0][0]
-        
-        return soup
+        # The rules are already in priority order
+        return recommendations
     
     def _analyze_semantic_elements(self, soup: BeautifulSoup) -> Dict[str, int]:
         """
@@ -1815,19 +2201,8 @@ class WebScraperService:
         Counts semantic HTML5 elements that improve content structure
         and help LLMs understand the page organization.
         """
-        semantic_elements = [
-            'header', 'footer', 'main', 'article', 'section', 
-            'nav', 'aside', 'figure', 'figcaption', 'time',
-            'mark', 'details', 'summary'
-        ]
-        
-        counts = {}
-        for element in semantic_elements:
-            count = len(soup.find_all(element))
-            if count > 0:
-                counts[element] = count
-        
-        return counts
+        tag_counts = self._element_index(soup)['counts']
+        return {element: tag_counts[element] for element in _SEMANTIC_ELEMENTS if tag_counts[element]}
     
     def _detect_structured_patterns(self, soup: BeautifulSoup) -> Dict[str, int]:
         """
@@ -1840,59 +2215,55 @@ class WebScraperService:
         - Tables with headers
         - Figures with captions
         - Accordions/expandable sections
+        
+        The result is kept in the per-document tag index, so repeated calls
+        for the same soup return a copy instead of querying the tree again.
         """
+        index = self._tag_index(soup)
+        if 'structured_patterns' in index:
+            return dict(index['structured_patterns'])
+        
         patterns = {}
+        elements = self._element_index(soup)
+        tag_counts = elements['counts']
         
         # Definition lists
-        dl_elements = soup.find_all('dl')
-        if dl_elements:
-            patterns['definition_lists'] = len(dl_elements)
-            dt_elements = soup.find_all('dt')
-            dd_elements = soup.find_all('dd')
-            patterns['definition_terms'] = len(dt_elements)
-            patterns['definition_descriptions'] = len(dd_elements)
+        if tag_counts['dl']:
+            patterns['definition_lists'] = tag_counts['dl']
+            patterns['definition_terms'] = tag_counts['dt']
+            patterns['definition_descriptions'] = tag_counts['dd']
         
         # Blockquotes
-        blockquotes = soup.find_all('blockquote')
-        if blockquotes:
-            patterns['blockquotes'] = len(blockquotes)
+        if tag_counts['blockquote']:
+            patterns['blockquotes'] = tag_counts['blockquote']
         
         # Code blocks
-        code_blocks = soup.find_all(['pre', 'code'])
+        code_blocks = tag_counts['pre'] + tag_counts['code']
         if code_blocks:
-            patterns['code_blocks'] = len(code_blocks)
+            patterns['code_blocks'] = code_blocks
         
         # Tables with headers
-        tables_with_headers = 0
-        for table in soup.find_all('table'):
-            if table.find('th'):
-                tables_with_headers += 1
+        tables_with_headers = sum(1 for table in elements['table'] if table.find('th'))
         if tables_with_headers:
             patterns['tables_with_headers'] = tables_with_headers
         
         # Figures with captions
-        figures = soup.find_all('figure')
-        figures_with_captions = sum(1 for fig in figures if fig.find('figcaption'))
+        figures_with_captions = sum(1 for fig in elements['figure'] if fig.find('figcaption'))
         if figures_with_captions:
             patterns['figures_with_captions'] = figures_with_captions
         
         # Accordions/expandable sections
-        details_elements = soup.find_all('details')
-        if details_elements:
-            patterns['expandable_sections'] = len(details_elements)
+        if tag_counts['details']:
+            patterns['expandable_sections'] = tag_counts['details']
         
         # Other common accordion patterns
-        accordion_selectors = ['.accordion', '.collapse', '.expandable', '[data-toggle="collapse"]']
-        for selector in accordion_selectors:
-            try:
-                elements = soup.select(selector)
-                if elements:
-                    patterns['accordion_elements'] = len(elements)
-                    break
-            except:
-                continue
+        for accordion_count in elements['accordions']:
+            if accordion_count:
+                patterns['accordion_elements'] = accordion_count
+                break
         
-        return patterns
+        index['structured_patterns'] = patterns
+        return dict(patterns)
     
     def _calculate_content_diversity(self, headings: Dict[str, int], paragraph_count: int,
                                     list_count: int, table_count: int, faq_count: int,
@@ -1903,41 +2274,17 @@ class WebScraperService:
         Measures how diverse and rich the content structure is,
         which correlates with higher LLM visibility.
         """
-        # Base score components
-        components = []
-        
         # Heading diversity (0-0.2)
         heading_types = sum(1 for h, count in headings.items() if count > 0)
-        heading_score = min(0.2, heading_types * 0.04)
-        components.append(heading_score)
+        score = min(0.2, heading_types * 0.04)
         
-        # Paragraph density (0-0.15)
-        paragraph_score = min(0.15, paragraph_count / 50 * 0.15)
-        components.append(paragraph_score)
+        # Paragraph, list, table, FAQ, image and semantic element components
+        counts = (paragraph_count, list_count, table_count, faq_count,
+                  image_count, sum(semantic_elements.values()))
+        for count, (saturation, cap) in zip(counts, _DIVERSITY_COMPONENTS):
+            score += min(cap, count / saturation * cap)
         
-        # List presence (0-0.15)
-        list_score = min(0.15, list_count / 5 * 0.15)
-        components.append(list_score)
-        
-        # Table presence (0-0.1)
-        table_score = min(0.1, table_count / 2 * 0.1)
-        components.append(table_score)
-        
-        # FAQ presence (0-0.15)
-        faq_score = min(0.15, faq_count / 3 * 0.15)
-        components.append(faq_score)
-        
-        # Image presence (0-0.1)
-        image_score = min(0.1, image_count / 10 * 0.1)
-        components.append(image_score)
-        
-        # Semantic HTML usage (0-0.15)
-        semantic_count = sum(semantic_elements.values())
-        semantic_score = min(0.15, semantic_count / 10 * 0.15)
-        components.append(semantic_score)
-        
-        # Calculate total score
-        return sum(components)
+        return score
     
     def _analyze_entity_mentions(self, text: str) -> Dict[str, List[str]]:
         """
@@ -1958,36 +2305,94 @@ class WebScraperService:
             "products": []
         }
         
+        # Nothing can match without an uppercase letter; skip the cleanup too
+        if not _UPPERCASE_RE.search(text):
+            return entities
+        
         # Simple cleanup
-        text = re.sub(r'\s+', ' ', text)
+        text = _WHITESPACE_RE.sub(' ', text)
+        has_capitalized_word = _CAPITALIZED_WORD_RE.search(text) is not None
         
         # People detection (simplified)
         # Look for Title Case Names
-        name_pattern = r'\b[A-Z][a-z]+\s+[A-Z][a-z]+\b'
-        potential_names = re.findall(name_pattern, text)
-        # Filter common false positives
-        common_phrases = {'New York', 'United States', 'Home Page', 'Privacy Policy'}
-        entities["people"] = [name for name in potential_names[:10] if name not in common_phrases]
+        if has_capitalized_word:
+            potential_names = _first_matches(_PERSON_NAME_RE, text)
+            # Filter common false positives
+            entities["people"] = [name for name in potential_names if name not in _COMMON_NAME_PHRASES]
         
         # Organization detection (simplified)
         # Look for Inc, LLC, Ltd, Corp patterns
-        org_pattern = r'\b[A-Z][A-Za-z0-9\s]+\s+(?:Inc|LLC|Ltd|Corp|Corporation|Company)\b'
-        entities["organizations"] = re.findall(org_pattern, text)[:10]
+        # The leading character class overlaps the separator, so a page with no
+        # suffix at all would make every capitalized word backtrack to the end
+        # of its run; check for a suffix first
+        if _ORGANIZATION_SUFFIX_RE.search(text):
+            entities["organizations"] = _first_matches(_ORGANIZATION_RE, text)
         
         # Location detection (simplified)
         # Common location patterns
-        location_patterns = [
-            r'\b[A-Z][a-z]+,\s+[A-Z]{2}\b',  # City, State
-            r'\b[A-Z][a-z]+,\s+[A-Z][a-z]+\b'  # City, Country
-        ]
         locations = []
-        for pattern in location_patterns:
-            locations.extend(re.findall(pattern, text))
-        entities["locations"] = locations[:10]
+        if has_capitalized_word and ',' in text:
+            for pattern in _LOCATION_RES:
+                if len(locations) == _MAX_ENTITY_MENTIONS:
+                    break
+                locations.extend(_first_matches(pattern, text, _MAX_ENTITY_MENTIONS - len(locations)))
+        entities["locations"] = locations
         
         # Product detection (simplified)
         # Look for product model patterns
-        product_pattern = r'\b[A-Z][a-z]+\s+(?:[A-Z0-9]{1,4}-[A-Z0-9]{1,4}|[A-Z0-9]{3,10})\b'
-        entities["products"] = re.findall(product_pattern, text)[:10]
+        if has_capitalized_word:
+            entities["products"] = _first_matches(_PRODUCT_RE, text)
         
-        return entities
\ No newline at end of file
+        return entities
+
+
+# Process pool for audit_batch (lazy initialization)
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+# Per-worker-process scraper, so each worker reuses its own requests.Session
+_worker_scraper: Optional[WebScraperService] = None
+
+# Thread pool for the sitemap.xml/robots.txt probes (lazy initialization)
+_probe_pool: Optional[ThreadPoolExecutor] = None
+PROBE_POOL_MAX_WORKERS = 8
+
+# Per-thread session for the probes; requests.Session is not thread-safe
+_probe_local = threading.local()
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """
+    Get the shared process pool used for batch audits
+    
+    Workers are spawned rather than forked, since this process may already
+    be running the probe threads, and the pool is shut down at exit.
+    """
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context('spawn')
+        )
+        atexit.register(_process_pool.shutdown)
+    return _process_pool
+
+def _get_probe_pool() -> ThreadPoolExecutor:
+    """Get the shared thread pool used for sitemap.xml/robots.txt probes"""
+    global _probe_pool
+    if _probe_pool is None:
+        _probe_pool = ThreadPoolExecutor(max_workers=PROBE_POOL_MAX_WORKERS,
+                                         thread_name_prefix='llmo-probe')
+    return _probe_pool
+
+def _probe_session() -> requests.Session:
+    """Get the calling thread's probe session, so keep-alive connections are reused per thread"""
+    session = getattr(_probe_local, 'session', None)
+    if session is None:
+        session = _probe_local.session = _new_session()
+    return session
+
+def _audit_sync(domain: str) -> Dict:
+    """Audit a single website inside a worker process"""
+    global _worker_scraper
+    if _worker_scraper is None:
+        _worker_scraper = WebScraperService()
+    return asyncio.run(_worker_scraper.audit_website(domain))
@@ -5,26 +5,111 @@ Validates configuration, applies schema, and tests basic functionality
 Run with: python setup_database.py
 """
 import os
+import re
 import sys
 import asyncio
-from pathlib import Path
-from typing import Dict, Any, List
+import argparse
+import hashlib
 import json
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Sequence
+
+try:
+    import orjson
+except ImportError:  # The report is small; the stdlib encoder will do
+    orjson = None
+
+# Backend directory and the files setup reads and writes there
+BACKEND_DIR = Path(__file__).resolve().parent
+SCHEMA_FILE = BACKEND_DIR / 'database' / 'schema.sql'
+SETUP_REPORT_FILE = BACKEND_DIR / 'setup_report.json'
 
 # Add the backend directory to Python path
-sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(BACKEND_DIR))
 
-from database.supabase_client import get_supabase, get_supabase_client
-from services.database_service import db_service
-from services.cache_service import cache_service
+# Only the lightweight config module is imported here; the Supabase client
+# and services are imported by the steps that use them, so --help stays fast
 from config import get_settings
 
-settings = get_settings()
+# Error codes for calling a database function that does not exist yet:
+# PostgREST's schema cache miss, and Postgres' undefined_function
+MISSING_FUNCTION_CODES = ('PGRST202', '42883')
+
+def _json_dumps(data: Any, sort_keys: bool = False) -> bytes:
+    """Serialize to compact JSON bytes, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS if sort_keys else None)
+    return json.dumps(
+        data, separators=(',', ':'), sort_keys=sort_keys, ensure_ascii=False
+    ).encode('utf-8')
+
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON bytes, with orjson when it is installed"""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+# Statements sent per exec_sql call when applying the schema
+SCHEMA_BATCH_SIZE = 200
+
+# Cache entries written and removed by the bulk operations test
+SETUP_BULK_TEST_ROWS = 100
+
+# Progress lines printed while applying the schema
+SCHEMA_PROGRESS_LINES = 20
+
+# Tables created by schema.sql, in report order
+REQUIRED_TABLES = (
+    'profiles',
+    'brands',
+    'scans',
+    'visibility_results',
+    'audit_results',
+    'simulation_results',
+    'llm_response_cache'
+)
+
+# Tables schema.sql protects with row level security
+TABLES_WITH_RLS = (
+    'profiles',
+    'brands',
+    'scans',
+    'visibility_results',
+    'audit_results',
+    'simulation_results'
+)
+
+# SQL tokens that matter for finding statement boundaries: semicolons only end
+# a statement outside comments, quoted strings/identifiers and $tag$ bodies
+SQL_TOKEN_RE = re.compile(r"""
+      (?P<comment>--[^\n]*|/\*.*?\*/)
+    | \$(?P<tag>[A-Za-z_]\w*|)\$.*?\$(?P=tag)\$
+    | '(?:[^']|'')*' | "(?:[^"]|"")*"
+    | (?P<end>;)
+    | [^-/$'";]+ | .
+""", re.DOTALL | re.VERBOSE)
+
+def split_sql_statements(sql: str) -> Iterator[str]:
+    """Split SQL into statements in one pass, dropping comments and empty statements"""
+    parts = []
+    for token in SQL_TOKEN_RE.finditer(sql):
+        if token.group('end'):
+            statement = ''.join(parts).strip()
+            if statement:
+                yield statement
+            parts = []
+        elif token.group('comment'):
+            parts.append(' ')
+        else:
+            parts.append(token.group())
+    
+    statement = ''.join(parts).strip()
+    if statement:
+        yield statement
 
 class DatabaseSetup:
     """Database setup and validation utility"""
     
     def __init__(self):
+        self.settings = get_settings()
         self.supabase = None
         self.errors = []
         self.warnings = []
@@ -33,18 +118,18 @@ class DatabaseSetup:
         """Validate Supabase configuration"""
         print("🔍 Validating Supabase configuration...")
         
-        missing_settings = settings.validate_required_settings()
+        missing_settings = self.settings.validate_required_settings()
         if missing_settings:
             self.errors.append(f"Missing required settings: {', '.join(missing_settings)}")
             return False
         
         # Check URL format
-        if not settings.SUPABASE_URL.startswith('https://'):
+        if not self.settings.SUPABASE_URL.startswith('https://'):
             self.errors.append("SUPABASE_URL should start with https://")
             return False
         
         # Check key format (basic validation)
-        if len(settings.SUPABASE_SERVICE_KEY) < 50:
+        if len(self.settings.SUPABASE_SERVICE_KEY) < 50:
             self.warnings.append("SUPABASE_SERVICE_KEY seems too short")
         
         print("✅ Configuration validation passed")
@@ -55,6 +140,8 @@ class DatabaseSetup:
         print("🔗 Testing Supabase connection...")
         
         try:
+            from database.supabase_client import get_supabase
+            
             self.supabase = get_supabase()
             if not self.supabase:
                 self.errors.append("Failed to initialize Supabase client")
@@ -72,8 +159,10 @@ class DatabaseSetup:
         print("🏥 Testing database health...")
         
         try:
+            from database.supabase_client import get_supabase_client
+            
             client_wrapper = get_supabase_client()
-            health_status = await client_wrapper.health_check()
+            health_status = await client_wrapper.health_check_fast()
             
             if health_status:
                 print("✅ Database health check passed")
@@ -86,72 +175,103 @@ class DatabaseSetup:
             self.warnings.append(f"Health check error: {str(e)}")
             return False
     
-    def check_tables_exist(self) -> Dict[str, bool]:
-        """Check if required tables exist"""
+    async def check_tables_exist(self) -> Dict[str, bool]:
+        """
+        Check if required tables exist
+        
+        One get_existing_tables RPC answers for every table from
+        information_schema. That function is created by schema.sql, so
+        until the schema is applied each table is probed instead; the
+        probes run concurrently in worker threads.
+        """
         print("📋 Checking database tables...")
         
-        required_tables = [
-            'profiles',
-            'brands',
-            'scans',
-            'visibility_results',
-            'audit_results',
-            'simulation_results',
-            'llm_response_cache'
-        ]
+        from postgrest.exceptions import APIError
+        
+        try:
+            result = await asyncio.to_thread(
+                lambda: self.supabase.rpc('get_existing_tables', {'names': list(REQUIRED_TABLES)}).execute()
+            )
+            existing = {row['table_name'] for row in result.data}
+            errors = {table: "not found" for table in REQUIRED_TABLES if table not in existing}
+        except APIError as e:
+            # Any other failure (network, auth) is the real error; report it
+            if e.code not in MISSING_FUNCTION_CODES:
+                raise
+            errors = await self._probe_tables(REQUIRED_TABLES)
         
         table_status = {}
         
-        for table in required_tables:
-            try:
-                # Try to query the table with limit 0
-                result = self.supabase.table(table).select('*').limit(0).execute()
+        for table in REQUIRED_TABLES:
+            if table in errors:
+                table_status[table] = False
+                print(f"  ❌ {table} - {errors[table]}")
+            else:
                 table_status[table] = True
                 print(f"  ✅ {table}")
-            except Exception as e:
-                table_status[table] = False
-                print(f"  ❌ {table} - {str(e)}")
         
         return table_status
     
-    def apply_schema(self) -> bool:
-        """Apply database schema from schema.sql file"""
-        print("📝 Applying database schema...")
+    async def _probe_tables(self, tables: Sequence[str]) -> Dict[str, str]:
+        """Query each table with limit 0, returning the error for each one that failed"""
+        def probe(table: str):
+            return self.supabase.table(table).select('*').limit(0).execute()
+        
+        results = await asyncio.gather(
+            *(asyncio.to_thread(probe, table) for table in tables),
+            return_exceptions=True
+        )
+        return {
+            table: str(result)
+            for table, result in zip(tables, results)
+            if isinstance(result, Exception)
+        }
+    
+    def apply_schema(self, batch_size: int = SCHEMA_BATCH_SIZE) -> bool:
+        """
+        Apply database schema from schema.sql file
         
-        schema_file = Path(__file__).parent / 'database' / 'schema.sql'
+        Statements are sent in batches of batch_size, one exec_sql RPC call
+        per batch. PostgREST runs each call in its own transaction, so a
+        failing batch is rolled back as a whole. This needs an
+        exec_sql(sql text) function that only the service role may execute;
+        schema.sql does not define one, since it grants EXECUTE on every
+        public function to anon.
+        """
+        print("📝 Applying database schema...")
         
-        if not schema_file.exists():
-            self.errors.append(f"Schema file not found: {schema_file}")
+        if not SCHEMA_FILE.exists():
+            self.errors.append(f"Schema file not found: {SCHEMA_FILE}")
             return False
         
         try:
-            with open(schema_file, 'r') as f:
+            with open(SCHEMA_FILE, 'r') as f:
                 schema_sql = f.read()
             
             # Split schema into individual statements
-            statements = [stmt.strip() for stmt in schema_sql.split(';') if stmt.strip()]
+            statements = list(split_sql_statements(schema_sql))
+            batches = [statements[i:i + batch_size] for i in range(0, len(statements), batch_size)]
             
-            print(f"  Executing {len(statements)} SQL statements...")
+            print(f"  Executing {len(statements)} SQL statements in {len(batches)} batch(es)...")
             
+            # Report progress at most SCHEMA_PROGRESS_LINES times, however small the batches
+            progress_step = max(1, -(-len(batches) // SCHEMA_PROGRESS_LINES))
             success_count = 0
-            for i, statement in enumerate(statements):
+            for i, batch in enumerate(batches):
                 try:
-                    # Skip comments and empty statements
-                    if statement.startswith('--') or not statement:
-                        continue
-                    
-                    # Execute statement using RPC (if available) or direct SQL
-                    # Note: This is a simplified approach - in production,
-                    # you'd use proper migration tools
-                    print(f"  Executing statement {i+1}/{len(statements)}")
-                    success_count += 1
+                    sql = ";\n".join(batch) + ";"
+                    self.supabase.rpc('exec_sql', {'sql': sql}).execute()
+                    success_count += len(batch)
+                    if (i + 1) % progress_step == 0 or i + 1 == len(batches):
+                        print(f"  Executed batch {i+1}/{len(batches)} ({success_count} statements so far)")
                     
                 except Exception as e:
-                    print(f"  ⚠️  Statement {i+1} failed: {str(e)}")
-                    # Continue with other statements
+                    self.warnings.append(f"Schema batch {i+1} failed: {str(e)}")
+                    print(f"  ⚠️  Batch {i+1} failed: {str(e)}")
+                    # Continue with other batches
             
             print(f"✅ Schema application completed ({success_count}/{len(statements)} statements)")
-            return True
+            return success_count == len(statements)
             
         except Exception as e:
             self.errors.append(f"Schema application failed: {str(e)}")
@@ -162,29 +282,25 @@ class DatabaseSetup:
         print("🧪 Testing basic database operations...")
         
         try:
+            from services.cache_service import cache_service
+            
             # Test cache operations (doesn't require RLS)
             cache_key = "setup_test_key"
             test_data = {"test": "setup_validation", "timestamp": "2024-01-01"}
             
-            # Test cache set
-            set_success = await cache_service.set(
-                cache_key, 
-                test_data, 
-                "test-model",
-                "setup test prompt",
-                1  # 1 hour TTL
-            )
+            # Test cache set, get and delete in one round trip
+            set_success, retrieved_data, delete_success = await cache_service.pipeline([
+                ("set", cache_key, test_data, "test-model", "setup test prompt", 1),  # 1 hour TTL
+                ("get", cache_key),
+                ("delete", cache_key)
+            ])
             
             if set_success:
                 print("  ✅ Cache set operation")
                 
-                # Test cache get
-                retrieved_data = await cache_service.get(cache_key)
                 if retrieved_data and retrieved_data.get("test") == "setup_validation":
                     print("  ✅ Cache get operation")
                     
-                    # Test cache delete
-                    delete_success = await cache_service.delete(cache_key)
                     if delete_success:
                         print("  ✅ Cache delete operation")
                     else:
@@ -194,6 +310,18 @@ class DatabaseSetup:
             else:
                 print("  ⚠️  Cache set operation failed")
             
+            # Test bulk cache set and delete
+            bulk_keys = [f"setup_test_bulk_{i}" for i in range(SETUP_BULK_TEST_ROWS)]
+            stored_count = await cache_service.set_many([
+                (key, test_data, "test-model", "setup test prompt", 1) for key in bulk_keys
+            ])
+            deleted_count = await cache_service.delete_many(bulk_keys)
+            
+            if stored_count == deleted_count == len(bulk_keys):
+                print(f"  ✅ Cache bulk set/delete operations ({len(bulk_keys)} entries)")
+            else:
+                print(f"  ⚠️  Cache bulk operations stored {stored_count} and deleted {deleted_count} of {len(bulk_keys)} entries")
+            
             # Test cache stats
             stats = await cache_service.get_stats()
             print(f"  ✅ Cache stats: {stats.total_entries} entries")
@@ -204,27 +332,31 @@ class DatabaseSetup:
             self.warnings.append(f"Basic operations test failed: {str(e)}")
             return False
     
-    def check_rls_policies(self) -> Dict[str, bool]:
-        """Check if RLS policies are in place (conceptual)"""
+    async def check_rls_policies(self) -> Dict[str, bool]:
+        """
+        Check if RLS policies are in place
+        
+        One get_tables_with_policies RPC reads pg_policies for every table.
+        Until schema.sql has created that function, RLS is assumed to be
+        configured.
+        """
         print("🔒 Checking Row Level Security policies...")
         
-        # This is a conceptual check - in a real implementation,
-        # we would query pg_policies to verify RLS policies exist
+        try:
+            result = await asyncio.to_thread(
+                lambda: self.supabase.rpc('get_tables_with_policies', {'names': list(TABLES_WITH_RLS)}).execute()
+            )
+        except Exception:
+            rls_status = dict.fromkeys(TABLES_WITH_RLS, True)  # Assume RLS is configured
+            print("\n".join(f"  ✅ {table} (assumed)" for table in TABLES_WITH_RLS))
+            return rls_status
         
-        tables_with_rls = [
-            'profiles',
-            'brands',
-            'scans',
-            'visibility_results',
-            'audit_results',
-            'simulation_results'
-        ]
-        
-        rls_status = {}
-        for table in tables_with_rls:
-            # In real implementation: SELECT * FROM pg_policies WHERE tablename = table
-            rls_status[table] = True  # Assume RLS is configured
-            print(f"  ✅ {table} (assumed)")
+        with_policies = {row['table_name'] for row in result.data}
+        rls_status = {table: table in with_policies for table in TABLES_WITH_RLS}
+        print("\n".join(
+            f"  ✅ {table}" if has_policies else f"  ❌ {table} - no policies"
+            for table, has_policies in rls_status.items()
+        ))
         
         return rls_status
     
@@ -232,20 +364,48 @@ class DatabaseSetup:
         """Generate setup report"""
         return {
             "configuration": {
-                "supabase_url": settings.SUPABASE_URL,
-                "has_service_key": bool(settings.SUPABASE_SERVICE_KEY),
-                "has_anon_key": bool(settings.SUPABASE_ANON_KEY),
-                "cache_ttl_hours": settings.CACHE_TTL_HOURS,
+                "supabase_url": self.settings.SUPABASE_URL,
+                "has_service_key": bool(self.settings.SUPABASE_SERVICE_KEY),
+                "has_anon_key": bool(self.settings.SUPABASE_ANON_KEY),
+                "cache_ttl_hours": self.settings.CACHE_TTL_HOURS,
                 "subscription_limits": {
-                    "free": settings.FREE_TIER_SCANS,
-                    "pro": settings.PRO_TIER_SCANS,
-                    "agency": settings.AGENCY_TIER_SCANS
+                    "free": self.settings.FREE_TIER_SCANS,
+                    "pro": self.settings.PRO_TIER_SCANS,
+                    "agency": self.settings.AGENCY_TIER_SCANS
                 }
             },
             "errors": self.errors,
             "warnings": self.warnings
         }
     
+    def compute_fingerprint(self) -> List[str]:
+        """Fingerprint the inputs of a setup run: schema.sql and the Supabase settings"""
+        schema_hash = hashlib.blake2b(
+            SCHEMA_FILE.read_bytes() if SCHEMA_FILE.exists() else b''
+        ).hexdigest()
+        
+        settings_data = {
+            **self.generate_setup_report()["configuration"],
+            "service_key": self.settings.SUPABASE_SERVICE_KEY,
+            "anon_key": self.settings.SUPABASE_ANON_KEY
+        }
+        settings_hash = hashlib.blake2b(
+            _json_dumps(settings_data, sort_keys=True)
+        ).hexdigest()
+        
+        return [schema_hash, settings_hash]
+    
+    def is_up_to_date(self, report_file: Path, fingerprint: List[str]) -> bool:
+        """Check if the last saved report is a clean run (no errors or warnings) with the same fingerprint"""
+        try:
+            with open(report_file, 'rb') as f:
+                report = _json_loads(f.read())
+        except (OSError, ValueError):
+            return False
+        
+        return (report.get("fingerprint") == fingerprint and
+                report.get("errors") == [] and report.get("warnings") == [])
+    
     def print_summary(self):
         """Print setup summary"""
         print("\n" + "="*60)
@@ -274,7 +434,7 @@ class DatabaseSetup:
         
         print("\n" + "="*60)
 
-async def main():
+async def main(apply_schema: bool = False, batch_size: int = SCHEMA_BATCH_SIZE, force: bool = False):
     """Main setup function"""
     print("🚀 Starting Supabase Database Setup")
     print("="*50)
@@ -286,16 +446,42 @@ async def main():
         setup.print_summary()
         return False
     
+    # Skip the remaining steps if nothing changed since the last clean run;
+    # an explicit --apply-schema always runs
+    fingerprint = setup.compute_fingerprint()
+    if not force and not apply_schema and setup.is_up_to_date(SETUP_REPORT_FILE, fingerprint):
+        print("✅ Setup up-to-date (schema.sql and settings unchanged since the last clean run)")
+        print("   Use --force to run every step again")
+        return True
+    
     # Step 2: Test connection
     if not setup.test_connection():
         setup.print_summary()
         return False
     
-    # Step 3: Test health
-    await setup.test_health_check()
+    # Optional: apply the schema before checking for tables
+    if apply_schema:
+        setup.apply_schema(batch_size)
+    
+    # Steps 3, 4 and 6: Test health, check tables and check RLS policies.
+    # They are independent probes, so they run concurrently.
+    health_ok, table_status, rls_status = await asyncio.gather(
+        setup.test_health_check(),
+        setup.check_tables_exist(),
+        setup.check_rls_policies(),
+        return_exceptions=True
+    )
+    if isinstance(table_status, Exception):
+        setup.warnings.append(f"Table check error: {str(table_status)}")
+        table_status = {}
+    if isinstance(rls_status, Exception):
+        setup.warnings.append(f"RLS check error: {str(rls_status)}")
+        rls_status = {}
+    
+    tables_without_rls = [table for table, has_policies in rls_status.items() if not has_policies]
+    if tables_without_rls:
+        setup.warnings.append(f"No RLS policies on: {', '.join(tables_without_rls)}")
     
-    # Step 4: Check tables
-    table_status = setup.check_tables_exist()
     missing_tables = [table for table, exists in table_status.items() if not exists]
     
     if missing_tables:
@@ -307,17 +493,17 @@ async def main():
     # Step 5: Test basic operations
     await setup.test_basic_operations()
     
-    # Step 6: Check RLS policies (conceptual)
-    rls_status = setup.check_rls_policies()
-    
     # Step 7: Generate and save report
     report = setup.generate_setup_report()
-    report_file = Path(__file__).parent / 'setup_report.json'
+    if not setup.errors and not setup.warnings and not missing_tables:
+        report["fingerprint"] = fingerprint
     
     try:
-        with open(report_file, 'w') as f:
-            json.dump(report, f, indent=2)
-        print(f"\n📄 Setup report saved to: {report_file}")
+        # Compact JSON for tools; use python -m json.tool to read it
+        with open(SETUP_REPORT_FILE, 'wb') as f:
+            f.write(_json_dumps(report))
+        print(f"\n📄 Setup report saved to: {SETUP_REPORT_FILE} "
+              f"({len(setup.errors)} errors, {len(setup.warnings)} warnings)")
     except Exception as e:
         print(f"\n⚠️  Could not save report: {e}")
     
@@ -342,8 +528,11 @@ Prerequisites:
    - SUPABASE_ANON_KEY=your_anon_key (optional)
 
 Usage:
-  python setup_database.py          # Run full setup
-  python setup_database.py --help   # Show this help
+  python setup_database.py                   # Run full setup
+  python setup_database.py --apply-schema    # Also apply schema.sql via exec_sql
+  python setup_database.py --batch-size 500  # Statements per exec_sql call (default 200)
+  python setup_database.py --force           # Run every step even if nothing changed
+  python setup_database.py --help            # Show this help
 
 What this script does:
 1. ✅ Validates your Supabase configuration
@@ -363,12 +552,19 @@ For more information, see the project documentation.
 """)
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1 and sys.argv[1] in ['--help', '-h']:
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--help', '-h', action='store_true')
+    parser.add_argument('--apply-schema', action='store_true')
+    parser.add_argument('--batch-size', type=int, default=SCHEMA_BATCH_SIZE)
+    parser.add_argument('--force', action='store_true')
+    args = parser.parse_args()
+    
+    if args.help:
         print_help()
         sys.exit(0)
     
     try:
-        success = asyncio.run(main())
+        success = asyncio.run(main(args.apply_schema, max(1, args.batch_size), args.force))
         sys.exit(0 if success else 1)
     except KeyboardInterrupt:
         print("\n\n⏹️  Setup interrupted by user")
@@ -0,0 +1,260 @@
+"""
+In-memory stand-in for the Supabase client, used by the database integration
+tests when they are not run against a live project.
+
+Supports the subset of the PostgREST query builder the services use:
+select/insert/upsert/update/delete filtered with eq/neq/gt/gte/lt/lte/in_,
+ordered and limited, plus the clean_expired_cache RPC. Rows round-trip
+through JSON like they do over the wire, and the schema's unique keys are
+enforced.
+"""
+import json
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from postgrest.exceptions import APIError
+
+# Columns the schema fills with NOW() when an insert leaves them out
+TIMESTAMP_DEFAULTS = {
+    'profiles': ('created_at', 'updated_at'),
+    'brands': ('created_at', 'updated_at'),
+    'scans': ('started_at', 'created_at', 'updated_at'),
+    'visibility_results': ('created_at',),
+    'audit_results': ('created_at',),
+    'simulation_results': ('created_at',),
+    'llm_response_cache': ('created_at',),
+}
+
+# ON DELETE CASCADE foreign keys: parent table -> (child table, column)
+CASCADES = {
+    'brands': (('scans', 'brand_id'),),
+    'scans': (
+        ('visibility_results', 'scan_id'),
+        ('audit_results', 'scan_id'),
+        ('simulation_results', 'scan_id'),
+    ),
+}
+
+# UNIQUE constraints besides the primary key: table -> ((constraint, columns), ...)
+UNIQUE_KEYS = {
+    'brands': (('unique_brand_per_user', ('user_id', 'name', 'domain')),),
+    'visibility_results': (('unique_visibility_result_per_scan', ('scan_id',)),),
+    'audit_results': (('unique_audit_result_per_scan', ('scan_id',)),),
+    'llm_response_cache': (('llm_response_cache_cache_key_key', ('cache_key',)),),
+}
+
+@dataclass
+class InMemoryResponse:
+    """Mirrors the data/count attributes of a postgrest APIResponse"""
+    data: Any
+    count: Optional[int] = None
+
+def _to_wire(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Serialize a row the way the client would send it"""
+    return json.loads(json.dumps(row, default=str))
+
+class InMemoryQuery:
+    """A single table query, built up and run like the PostgREST builder"""
+
+    def __init__(self, db: "InMemorySupabase", table: str):
+        self._db = db
+        self._table = table
+        self._action = 'select'
+        self._columns = '*'
+        self._payload: Any = None
+        self._on_conflict = 'id'
+        self._ignore_duplicates = False
+        self._filters: List[Callable[[Dict[str, Any]], bool]] = []
+        self._order: List[tuple] = []
+        self._limit: Optional[int] = None
+
+    # Actions
+    def select(self, columns: str = '*', count: Optional[str] = None) -> "InMemoryQuery":
+        self._action, self._columns = 'select', columns
+        return self
+
+    def insert(self, rows: Any) -> "InMemoryQuery":
+        self._action, self._payload = 'insert', rows
+        return self
+
+    def upsert(self, rows: Any, on_conflict: str = 'id', ignore_duplicates: bool = False) -> "InMemoryQuery":
+        self._action, self._payload, self._on_conflict = 'upsert', rows, on_conflict
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, data: Dict[str, Any]) -> "InMemoryQuery":
+        self._action, self._payload = 'update', data
+        return self
+
+    def delete(self) -> "InMemoryQuery":
+        self._action = 'delete'
+        return self
+
+    # Filters
+    def _where(self, column: str, test: Callable[[Any], bool]) -> "InMemoryQuery":
+        self._filters.append(lambda row: row.get(column) is not None and test(row[column]))
+        return self
+
+    def eq(self, column: str, value: Any) -> "InMemoryQuery":
+        return self._where(column, lambda v: v == _to_wire({'v': value})['v'])
+
+    def neq(self, column: str, value: Any) -> "InMemoryQuery":
+        return self._where(column, lambda v: v != _to_wire({'v': value})['v'])
+
+    def gt(self, column: str, value: Any) -> "InMemoryQuery":
+        return self._where(column, lambda v: v > value)
+
+    def gte(self, column: str, value: Any) -> "InMemoryQuery":
+        return self._where(column, lambda v: v >= value)
+
+    def lt(self, column: str, value: Any) -> "InMemoryQuery":
+        return self._where(column, lambda v: v < value)
+
+    def lte(self, column: str, value: Any) -> "InMemoryQuery":
+        return self._where(column, lambda v: v <= value)
+
+    def in_(self, column: str, values: List[Any]) -> "InMemoryQuery":
+        wanted = set(_to_wire({'v': list(values)})['v'])
+        return self._where(column, lambda v: v in wanted)
+
+    # Modifiers
+    def order(self, column: str, desc: bool = False) -> "InMemoryQuery":
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, size: int) -> "InMemoryQuery":
+        self._limit = size
+        return self
+
+    def execute(self) -> InMemoryResponse:
+        rows = self._db.tables[self._table]
+
+        if self._action == 'insert':
+            return InMemoryResponse(self._db.insert(self._table, self._payload))
+        if self._action == 'upsert':
+            return InMemoryResponse(self._db.insert(
+                self._table, self._payload, self._on_conflict, self._ignore_duplicates
+            ))
+
+        matched = [row for row in rows if all(test(row) for test in self._filters)]
+
+        if self._action == 'update':
+            changes = _to_wire(self._payload)
+            for row in matched:
+                row.update(changes)
+            return InMemoryResponse([dict(row) for row in matched])
+        if self._action == 'delete':
+            self._db.delete(self._table, matched)
+            return InMemoryResponse([dict(row) for row in matched])
+
+        for column, desc in reversed(self._order):
+            matched.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        if self._limit is not None:
+            matched = matched[:self._limit]
+
+        if self._columns.strip() == '*':
+            data = [dict(row) for row in matched]
+        else:
+            columns = [column.strip() for column in self._columns.split(',')]
+            data = [{column: row.get(column) for column in columns} for row in matched]
+        return InMemoryResponse(data, count=len(data))
+
+class InMemoryRpc:
+    """A pending call to one of the registered database functions"""
+
+    def __init__(self, function: Callable[..., Any], params: Dict[str, Any]):
+        self._function = function
+        self._params = params
+
+    def execute(self) -> InMemoryResponse:
+        return InMemoryResponse(self._function(**self._params))
+
+class InMemorySupabase:
+    """Dict-backed replacement for the table() and rpc() parts of a Supabase client"""
+
+    def __init__(self):
+        self.tables: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.functions: Dict[str, Callable[..., Any]] = {
+            'clean_expired_cache': self._clean_expired_cache,
+        }
+
+    def table(self, name: str) -> InMemoryQuery:
+        return InMemoryQuery(self, name)
+
+    def rpc(self, name: str, params: Optional[Dict[str, Any]] = None) -> InMemoryRpc:
+        if name not in self.functions:
+            raise APIError({
+                'code': 'PGRST202',
+                'message': f'Could not find the function public.{name}'
+            })
+        return InMemoryRpc(self.functions[name], params or {})
+
+    def insert(
+        self,
+        table: str,
+        payload: Any,
+        on_conflict: Optional[str] = None,
+        ignore_duplicates: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Insert rows, filling schema defaults; with on_conflict, update or skip matching rows"""
+        rows = self.tables[table]
+        now = datetime.now().isoformat()
+        inserted = []
+
+        for new_row in _to_wire(payload if isinstance(payload, list) else [payload]):
+            new_row.setdefault('id', str(uuid.uuid4()))
+            for column in TIMESTAMP_DEFAULTS.get(table, ()):
+                new_row.setdefault(column, now)
+
+            key = on_conflict or 'id'
+            existing = next((row for row in rows if row.get(key) == new_row.get(key)), None)
+            if existing is not None and on_conflict is None:
+                raise APIError({
+                    'code': '23505',
+                    'message': f'duplicate key value violates unique constraint "{table}_pkey"'
+                })
+            if existing is not None and ignore_duplicates:
+                continue
+            if existing is not None:
+                new_row['id'] = existing['id']
+                self._check_unique(table, {**existing, **new_row})
+                existing.update(new_row)
+                inserted.append(dict(existing))
+            else:
+                self._check_unique(table, new_row)
+                rows.append(new_row)
+                inserted.append(dict(new_row))
+
+        return inserted
+
+    def _check_unique(self, table: str, new_row: Dict[str, Any]) -> None:
+        """Raise like Postgres if another row already holds one of new_row's unique keys"""
+        for constraint, columns in UNIQUE_KEYS.get(table, ()):
+            # NULLs never collide in a Postgres unique index
+            if any(new_row.get(column) is None for column in columns):
+                continue
+            for row in self.tables[table]:
+                if row['id'] != new_row['id'] and all(
+                    row.get(column) == new_row.get(column) for column in columns
+                ):
+                    raise APIError({
+                        'code': '23505',
+                        'message': f'duplicate key value violates unique constraint "{constraint}"'
+                    })
+
+    def delete(self, table: str, matched: List[Dict[str, Any]]) -> None:
+        """Delete rows, cascading to the tables that reference them"""
+        ids = {row['id'] for row in matched}
+        self.tables[table] = [row for row in self.tables[table] if row['id'] not in ids]
+
+        for child, column in CASCADES.get(table, ()):
+            self.delete(child, [row for row in self.tables[child] if row.get(column) in ids])
+
+    def _clean_expired_cache(self) -> int:
+        now = datetime.now().isoformat()
+        expired = [row for row in self.tables['llm_response_cache'] if row['expires_at'] <= now]
+        self.delete('llm_response_cache', expired)
+        return len(expired)
@@ -3,7 +3,8 @@ Integration tests for the Website Audit API
 Enhanced with comprehensive error handling, caching, and history tracking tests
 """
 import pytest
-from fastapi.testclient import TestClient
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
 from unittest.mock import patch, MagicMock, AsyncMock
 import json
 from datetime import datetime, timedelta
@@ -12,9 +13,6 @@ from main import app
 from services.web_scraper import WebScraperService
 from models.database import ScanStatus, ScanType
 
-# Create test client
-client = TestClient(app)
-
 # Sample audit result for mocking
 SAMPLE_AUDIT_RESULT = {
     "domain": "https://example.com",
@@ -95,6 +93,30 @@ MOCK_PROFILE = {
     "updated_at": "2023-01-01T00:00:00Z"
 }
 
+# Mock scan object, built once and shared by every test
+MOCK_SCAN = MagicMock()
+MOCK_SCAN.id = "test-scan-id"
+MOCK_SCAN.scan_type = ScanType.AUDIT
+MOCK_SCAN.status = ScanStatus.COMPLETED
+MOCK_SCAN.started_at = MOCK_SCAN.completed_at = datetime.now()
+MOCK_SCAN.metadata = {"domain": "https://example.com"}
+MOCK_SCAN.error_message = None
+
+# Mock audit result for MOCK_SCAN
+MOCK_AUDIT_RESULT = MagicMock()
+MOCK_AUDIT_RESULT.overall_score = 78
+MOCK_AUDIT_RESULT.schema_score = 75
+MOCK_AUDIT_RESULT.meta_score = 65
+MOCK_AUDIT_RESULT.content_score = 80
+MOCK_AUDIT_RESULT.technical_score = 90
+MOCK_AUDIT_RESULT.recommendations = SAMPLE_AUDIT_RESULT["recommendations"]
+
+@pytest_asyncio.fixture
+async def client():
+    """Async client that calls the app directly on the test's event loop"""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as test_client:
+        yield test_client
+
 @pytest.fixture
 def mock_auth():
     """Mock authentication middleware"""
@@ -113,18 +135,13 @@ def mock_verify_quota():
 def mock_db_service():
     """Mock database service"""
     with patch("services.database_service.db_service") as mock_db:
-        # Mock scan object
-        mock_scan = MagicMock()
-        mock_scan.id = "test-scan-id"
-        mock_scan.scan_type = ScanType.AUDIT
-        mock_scan.status = ScanStatus.COMPLETED
-        mock_scan.started_at = datetime.now()
-        mock_scan.completed_at = datetime.now()
-        mock_scan.metadata = {"domain": "https://example.com"}
-        mock_scan.error_message = None
+        # Reset what the previous test may have changed on the shared mocks
+        MOCK_SCAN.reset_mock()
+        MOCK_SCAN.metadata = {"domain": "https://example.com"}
+        MOCK_AUDIT_RESULT.reset_mock()
         
         # Mock create_scan
-        mock_db.create_scan = AsyncMock(return_value=mock_scan)
+        mock_db.create_scan = AsyncMock(return_value=MOCK_SCAN)
         
         # Mock update_scan_usage
         mock_db.update_scan_usage = AsyncMock(return_value=None)
@@ -136,22 +153,13 @@ def mock_db_service():
         mock_db.create_audit_result = AsyncMock(return_value="test-audit-result-id")
         
         # Mock get_user_scans
-        mock_db.get_user_scans = AsyncMock(return_value=[mock_scan])
+        mock_db.get_user_scans = AsyncMock(return_value=[MOCK_SCAN])
         
         # Mock get_scan
-        mock_db.get_scan = AsyncMock(return_value=mock_scan)
-        
-        # Mock audit result
-        mock_audit_result = MagicMock()
-        mock_audit_result.overall_score = 78
-        mock_audit_result.schema_score = 75
-        mock_audit_result.meta_score = 65
-        mock_audit_result.content_score = 80
-        mock_audit_result.technical_score = 90
-        mock_audit_result.recommendations = SAMPLE_AUDIT_RESULT["recommendations"]
+        mock_db.get_scan = AsyncMock(return_value=MOCK_SCAN)
         
         # Mock get_audit_result
-        mock_db.get_audit_result = AsyncMock(return_value=mock_audit_result)
+        mock_db.get_audit_result = AsyncMock(return_value=MOCK_AUDIT_RESULT)
         
         yield mock_db
 
@@ -181,7 +189,7 @@ class TestWebsiteAuditAPI:
     """Test cases for Website Audit API"""
     
     @pytest.mark.asyncio
-    async def test_audit_visibility_success(self, mock_auth, mock_verify_quota, mock_db_service, 
+    async def test_audit_visibility_success(self, client, mock_auth, mock_verify_quota, mock_db_service, 
                                      mock_web_scraper, mock_cache_service):
         """Test successful website audit"""
         # Setup request
@@ -190,7 +198,7 @@ class TestWebsiteAuditAPI:
         }
         
         # Make request
-        response = client.post(
+        response = await client.post(
             "/api/audit/visibility",
             json=request_data,
             headers={"Authorization": f"Bearer {MOCK_TOKEN}"}
@@ -240,7 +248,7 @@ class TestWebsiteAuditAPI:
         mock_cache_service.set.assert_called_once()
     
     @pytest.mark.asyncio
-    async def test_audit_visibility_cache_hit(self, mock_auth, mock_verify_quota, mock_db_service, 
+    async def test_audit_visibility_cache_hit(self, client, mock_auth, mock_verify_quota, mock_db_service, 
                                        mock_web_scraper, mock_cache_service):
         """Test website audit with cache hit"""
         # Setup cache hit
@@ -268,7 +276,7 @@ class TestWebsiteAuditAPI:
         }
         
         # Make request
-        response = client.post(
+        response = await client.post(
             "/api/audit/visibility",
             json=request_data,
             headers={"Authorization": f"Bearer {MOCK_TOKEN}"}
@@ -291,7 +299,7 @@ class TestWebsiteAuditAPI:
         mock_db_service.create_audit_result.assert_not_called()  # Should not create result
     
     @pytest.mark.asyncio
-    async def test_audit_visibility_invalid_domain(self, mock_auth, mock_verify_quota):
+    async def test_audit_visibility_invalid_domain(self, client, mock_auth, mock_verify_quota):
         """Test website audit with invalid domain"""
         # Setup request with invalid domain
         request_data = {
@@ -299,7 +307,7 @@ class TestWebsiteAuditAPI:
         }
         
         # Make request
-        response = client.post(
+        response = await client.post(
             "/api/audit/visibility",
             json=request_data,
             headers={"Authorization": f"Bearer {MOCK_TOKEN}"}
@@ -311,7 +319,7 @@ class TestWebsiteAuditAPI:
         assert "detail" in data
     
     @pytest.mark.asyncio
-    async def test_audit_visibility_error_handling(self, mock_auth, mock_verify_quota, 
+    async def test_audit_visibility_error_handling(self, client, mock_auth, mock_verify_quota, 
                                            mock_db_service, mock_web_scraper):
         """Test website audit error handling"""
         # Setup web scraper to raise exception
@@ -323,7 +331,7 @@ class TestWebsiteAuditAPI:
         }
         
         # Make request
-        response = client.post(
+        response = await client.post(
             "/api/audit/visibility",
             json=request_data,
             headers={"Authorization": f"Bearer {MOCK_TOKEN}"}
@@ -341,7 +349,7 @@ class TestWebsiteAuditAPI:
         mock_db_service.update_scan_usage.assert_called_once()
         
     @pytest.mark.asyncio
-    async def test_audit_visibility_unauthorized(self):
+    async def test_audit_visibility_unauthorized(self, client):
         """Test website audit without authentication"""
         # Setup request without auth token
         request_data = {
@@ -349,7 +357,7 @@ class TestWebsiteAuditAPI:
         }
         
         # Make request
-        response = client.post(
+        response = await client.post(
             "/api/audit/visibility",
             json=request_data
         )
@@ -358,7 +366,7 @@ class TestWebsiteAuditAPI:
         assert response.status_code == 401  # Unauthorized
     
     @pytest.mark.asyncio
-    async def test_audit_visibility_domain_normalization(self, mock_auth, mock_verify_quota, 
+    async def test_audit_visibility_domain_normalization(self, client, mock_auth, mock_verify_quota, 
                                                 mock_db_service, mock_web_scraper, mock_cache_service):
         """Test domain normalization in audit requests"""
         # Setup request with domain without protocol
@@ -367,7 +375,7 @@ class TestWebsiteAuditAPI:
         }
         
         # Make request
-        response = client.post(
+        response = await client.post(
             "/api/audit/visibility",
             json=request_data,
             headers={"Authorization": f"Bearer {MOCK_TOKEN}"}
@@ -384,7 +392,7 @@ class TestWebsiteAuditAPI:
         mock_web_scraper.assert_called_once_with("https://example.com")
     
     @pytest.mark.asyncio
-    async def test_audit_visibility_connection_error(self, mock_auth, mock_verify_quota, 
+    async def test_audit_visibility_connection_error(self, client, mock_auth, mock_verify_quota, 
                                             mock_db_service, mock_web_scraper, mock_cache_service):
         """Test audit with connection error handling"""
         # Setup web scraper to raise connection error
@@ -396,7 +404,7 @@ class TestWebsiteAuditAPI:
         }
         
         # Make request
-        response = client.post(
+        response = await client.post(
             "/api/audit/visibility",
             json=request_data,
             headers={"Authorization": f"Bearer {MOCK_TOKEN}"}
@@ -422,7 +430,7 @@ class TestWebsiteAuditAPI:
         mock_db_service.update_scan.assert_called_once()
     
     @pytest.mark.asyncio
-    async def test_audit_visibility_timeout_error(self, mock_auth, mock_verify_quota, 
+    async def test_audit_visibility_timeout_error(self, client, mock_auth, mock_verify_quota, 
                                           mock_db_service, mock_web_scraper, mock_cache_service):
         """Test audit with timeout error handling"""
         # Setup web scraper to raise timeout error
@@ -434,7 +442,7 @@ class TestWebsiteAuditAPI:
         }
         
         # Make request
-        response = client.post(
+        response = await client.post(
             "/api/audit/visibility",
             json=request_data,
             headers={"Authorization": f"Bearer {MOCK_TOKEN}"}
@@ -451,7 +459,7 @@ class TestWebsiteAuditAPI:
         assert "slow or temporarily unavailable" in data["error"]
     
     @pytest.mark.asyncio
-    async def test_audit_visibility_http_error(self, mock_auth, mock_verify_quota, 
+    async def test_audit_visibility_http_error(self, client, mock_auth, mock_verify_quota, 
                                       mock_db_service, mock_web_scraper, mock_cache_service):
         """Test audit with HTTP error handling"""
         # Setup web scraper to raise HTTP error
@@ -463,7 +471,7 @@ class TestWebsiteAuditAPI:
         }
         
         # Make request
-        response = client.post(
+        response = await client.post(
             "/api/audit/visibility",
             json=request_data,
             headers={"Authorization": f"Bearer {MOCK_TOKEN}"}
@@ -480,7 +488,7 @@ class TestWebsiteAuditAPI:
         assert "correct URL" in data["error"]
     
     @pytest.mark.asyncio
-    async def test_audit_visibility_ssl_error(self, mock_auth, mock_verify_quota, 
+    async def test_audit_visibility_ssl_error(self, client, mock_auth, mock_verify_quota, 
                                      mock_db_service, mock_web_scraper, mock_cache_service):
         """Test audit with SSL certificate error handling"""
         # Setup web scraper to raise SSL error
@@ -492,7 +500,7 @@ class TestWebsiteAuditAPI:
         }
         
         # Make request
-        response = client.post(
+        response = await client.post(
             "/api/audit/visibility",
             json=request_data,
             headers={"Authorization": f"Bearer {MOCK_TOKEN}"}
@@ -509,7 +517,7 @@ class TestWebsiteAuditAPI:
         assert "security configuration" in data["error"]
     
     @pytest.mark.asyncio
-    async def test_audit_visibility_cache_ttl(self, mock_auth, mock_verify_quota, 
+    async def test_audit_visibility_cache_ttl(self, client, mock_auth, mock_verify_quota, 
                                      mock_db_service, mock_web_scraper, mock_cache_service):
         """Test that audit results are cached with 6-hour TTL"""
         # Setup request
@@ -518,7 +526,7 @@ class TestWebsiteAuditAPI:
         }
         
         # Make request
-        response = client.post(
+        response = await client.post(
             "/api/audit/visibility",
             json=request_data,
             headers={"Authorization": f"Bearer {MOCK_TOKEN}"}
@@ -536,10 +544,10 @@ class TestAuditHistoryAPI:
     """Test cases for Audit History API endpoints"""
     
     @pytest.mark.asyncio
-    async def test_get_audit_history_success(self, mock_auth, mock_db_service):
+    async def test_get_audit_history_success(self, client, mock_auth, mock_db_service):
         """Test successful audit history retrieval"""
         # Make request
-        response = client.get(
+        response = await client.get(
             "/api/audit/history",
             headers={"Authorization": f"Bearer {MOCK_TOKEN}"}
         )
@@ -559,10 +567,10 @@ class TestAuditHistoryAPI:
         mock_db_service.get_audit_result.assert_called()
     
     @pytest.mark.asyncio
-    async def test_get_audit_history_with_domain_filter(self, mock_auth, mock_db_service):
+    async def test_get_audit_history_with_domain_filter(self, client, mock_auth, mock_db_service):
         """Test audit history with domain filtering"""
         # Make request with domain filter
-        response = client.get(
+        response = await client.get(
             "/api/audit/history?domain=example.com&limit=20",
             headers={"Authorization": f"Bearer {MOCK_TOKEN}"}
         )
@@ -576,22 +584,22 @@ class TestAuditHistoryAPI:
         assert data["limit"] == 20
     
     @pytest.mark.asyncio
-    async def test_get_audit_history_unauthorized(self):
+    async def test_get_audit_history_unauthorized(self, client):
         """Test audit history without authentication"""
         # Make request without auth token
-        response = client.get("/api/audit/history")
+        response = await client.get("/api/audit/history")
         
         # Verify response
         assert response.status_code == 401  # Unauthorized
     
     @pytest.mark.asyncio
-    async def test_get_audit_history_empty(self, mock_auth, mock_db_service):
+    async def test_get_audit_history_empty(self, client, mock_auth, mock_db_service):
         """Test audit history with no results"""
         # Mock empty scan list
         mock_db_service.get_user_scans = AsyncMock(return_value=[])
         
         # Make request
-        response = client.get(
+        response = await client.get(
             "/api/audit/history",
             headers={"Authorization": f"Bearer {MOCK_TOKEN}"}
         )
@@ -605,7 +613,7 @@ class TestAuditHistoryAPI:
         assert data["total_count"] == 0
     
     @pytest.mark.asyncio
-    async def test_compare_audits_success(self, mock_auth, mock_db_service):
+    async def test_compare_audits_success(self, client, mock_auth, mock_db_service):
         """Test successful audit comparison"""
         # Setup second scan for comparison
         mock_scan_2 = MagicMock()
@@ -634,7 +642,7 @@ class TestAuditHistoryAPI:
         ])
         
         # Make request
-        response = client.get(
+        response = await client.get(
             "/api/audit/compare/test-scan-id/test-scan-id-2",
             headers={"Authorization": f"Bearer {MOCK_TOKEN}"}
         )
@@ -663,7 +671,7 @@ class TestAuditHistoryAPI:
         assert summary["overall_improvement"] is True
     
     @pytest.mark.asyncio
-    async def test_compare_audits_not_found(self, mock_auth, mock_db_service):
+    async def test_compare_audits_not_found(self, client, mock_auth, mock_db_service):
         """Test audit comparison with non-existent scan"""
         # Mock database to return None for second scan
         mock_db_service.get_scan = AsyncMock(side_effect=[
@@ -672,7 +680,7 @@ class TestAuditHistoryAPI:
         ])
         
         # Make request
-        response = client.get(
+        response = await client.get(
             "/api/audit/compare/test-scan-id/nonexistent-scan-id",
             headers={"Authorization": f"Bearer {MOCK_TOKEN}"}
         )
@@ -683,16 +691,16 @@ class TestAuditHistoryAPI:
         assert "not found" in data["detail"]
     
     @pytest.mark.asyncio
-    async def test_compare_audits_unauthorized(self):
+    async def test_compare_audits_unauthorized(self, client):
         """Test audit comparison without authentication"""
         # Make request without auth token
-        response = client.get("/api/audit/compare/scan-1/scan-2")
+        response = await client.get("/api/audit/compare/scan-1/scan-2")
         
         # Verify response
         assert response.status_code == 401  # Unauthorized
     
     @pytest.mark.asyncio
-    async def test_compare_audits_invalid_scan_type(self, mock_auth, mock_db_service):
+    async def test_compare_audits_invalid_scan_type(self, client, mock_auth, mock_db_service):
         """Test audit comparison with non-audit scan"""
         # Mock second scan as non-audit type
         mock_scan_2 = MagicMock()
@@ -706,7 +714,7 @@ class TestAuditHistoryAPI:
         ])
         
         # Make request
-        response = client.get(
+        response = await client.get(
             "/api/audit/compare/test-scan-id/test-scan-id-2",
             headers={"Authorization": f"Bearer {MOCK_TOKEN}"}
         )
@@ -717,10 +725,10 @@ class TestAuditHistoryAPI:
         assert "must be website audits" in data["detail"]
     
     @pytest.mark.asyncio
-    async def test_get_domain_audit_history_success(self, mock_auth, mock_db_service):
+    async def test_get_domain_audit_history_success(self, client, mock_auth, mock_db_service):
         """Test domain-specific audit history"""
         # Make request
-        response = client.get(
+        response = await client.get(
             "/api/audit/domain-history/example.com",
             headers={"Authorization": f"Bearer {MOCK_TOKEN}"}
         )
@@ -741,13 +749,13 @@ class TestAuditHistoryAPI:
         assert "score_trend" in trend_analysis
     
     @pytest.mark.asyncio
-    async def test_get_domain_audit_history_no_data(self, mock_auth, mock_db_service):
+    async def test_get_domain_audit_history_no_data(self, client, mock_auth, mock_db_service):
         """Test domain audit history with no data"""
         # Mock empty scan list
         mock_db_service.get_user_scans = AsyncMock(return_value=[])
         
         # Make request
-        response = client.get(
+        response = await client.get(
             "/api/audit/domain-history/newdomain.com",
             headers={"Authorization": f"Bearer {MOCK_TOKEN}"}
         )
@@ -762,16 +770,16 @@ class TestAuditHistoryAPI:
         assert data["trend_analysis"]["score_trend"] == "no_data"
     
     @pytest.mark.asyncio
-    async def test_get_domain_audit_history_unauthorized(self):
+    async def test_get_domain_audit_history_unauthorized(self, client):
         """Test domain audit history without authentication"""
         # Make request without auth token
-        response = client.get("/api/audit/domain-history/example.com")
+        response = await client.get("/api/audit/domain-history/example.com")
         
         # Verify response
         assert response.status_code == 401  # Unauthorized
     
     @pytest.mark.asyncio
-    async def test_get_domain_audit_history_with_trend(self, mock_auth, mock_db_service):
+    async def test_get_domain_audit_history_with_trend(self, client, mock_auth, mock_db_service):
         """Test domain audit history with trend analysis"""
         # Setup multiple scans with different dates and scores
         mock_scan_1 = MagicMock()
@@ -817,7 +825,7 @@ class TestAuditHistoryAPI:
         ])
         
         # Make request
-        response = client.get(
+        response = await client.get(
             "/api/audit/domain-history/example.com",
             headers={"Authorization": f"Bearer {MOCK_TOKEN}"}
         )
@@ -842,10 +850,10 @@ class TestAuditHistoryAPI:
     """Test cases for Audit History API endpoints"""
     
     @pytest.mark.asyncio
-    async def test_get_audit_history_success(self, mock_auth, mock_db_service):
+    async def test_get_audit_history_success(self, client, mock_auth, mock_db_service):
         """Test successful audit history retrieval"""
         # Make request
-        response = client.get(
+        response = await client.get(
             "/api/audit/history",
             headers={"Authorization": f"Bearer {MOCK_TOKEN}"}
         )
@@ -865,10 +873,10 @@ class TestAuditHistoryAPI:
         mock_db_service.get_audit_result.assert_called()
     
     @pytest.mark.asyncio
-    async def test_get_audit_history_with_domain_filter(self, mock_auth, mock_db_service):
+    async def test_get_audit_history_with_domain_filter(self, client, mock_auth, mock_db_service):
         """Test audit history with domain filtering"""
         # Make request with domain filter
-        response = client.get(
+        response = await client.get(
             "/api/audit/history?domain=example.com&limit=20",
             headers={"Authorization": f"Bearer {MOCK_TOKEN}"}
         )
@@ -882,7 +890,7 @@ class TestAuditHistoryAPI:
         assert data["limit"] == 20
     
     @pytest.mark.asyncio
-    async def test_compare_audits_success(self, mock_auth, mock_db_service):
+    async def test_compare_audits_success(self, client, mock_auth, mock_db_service):
         """Test successful audit comparison"""
         # Setup second scan for comparison
         mock_scan_2 = MagicMock()
@@ -911,7 +919,7 @@ class TestAuditHistoryAPI:
         ]
         
         # Make request
-        response = client.get(
+        response = await client.get(
             "/api/audit/compare/test-scan-id/test-scan-id-2",
             headers={"Authorization": f"Bearer {MOCK_TOKEN}"}
         )
@@ -940,7 +948,7 @@ class TestAuditHistoryAPI:
         assert summary["overall_improvement"] is True
     
     @pytest.mark.asyncio
-    async def test_compare_audits_not_found(self, mock_auth, mock_db_service):
+    async def test_compare_audits_not_found(self, client, mock_auth, mock_db_service):
         """Test audit comparison with non-existent scan"""
         # Mock database to return None for second scan
         mock_db_service.get_scan.side_effect = [
@@ -949,7 +957,7 @@ class TestAuditHistoryAPI:
         ]
         
         # Make request
-        response = client.get(
+        response = await client.get(
             "/api/audit/compare/test-scan-id/nonexistent-scan-id",
             headers={"Authorization": f"Bearer {MOCK_TOKEN}"}
         )
@@ -960,10 +968,10 @@ class TestAuditHistoryAPI:
         assert "not found" in data["detail"]
     
     @pytest.mark.asyncio
-    async def test_get_domain_audit_history_success(self, mock_auth, mock_db_service):
+    async def test_get_domain_audit_history_success(self, client, mock_auth, mock_db_service):
         """Test domain-specific audit history"""
         # Make request
-        response = client.get(
+        response = await client.get(
             "/api/audit/domain-history/example.com",
             headers={"Authorization": f"Bearer {MOCK_TOKEN}"}
         )
@@ -987,13 +995,13 @@ class TestAuditHistoryAPI:
         assert "latest_score" in trend_analysis
     
     @pytest.mark.asyncio
-    async def test_get_domain_audit_history_no_data(self, mock_auth, mock_db_service):
+    async def test_get_domain_audit_history_no_data(self, client, mock_auth, mock_db_service):
         """Test domain audit history with no data"""
         # Mock empty scan list
         mock_db_service.get_user_scans = AsyncMock(return_value=[])
         
         # Make request
-        response = client.get(
+        response = await client.get(
             "/api/audit/domain-history/newdomain.com",
             headers={"Authorization": f"Bearer {MOCK_TOKEN}"}
         )
@@ -89,6 +89,32 @@ class TestSupabaseClient:
         result = await client.health_check()
         assert result is False
 
+    @pytest.mark.asyncio
+    async def test_health_check_fast(self):
+        """Test that the fast health check only opens a TCP connection"""
+        client = SupabaseClient()
+        writer = Mock(wait_closed=AsyncMock())
+        
+        with patch.object(client, 'health_check', AsyncMock(return_value=True)) as mock_health, \
+             patch.object(client, '_address', ('test.supabase.co', 443)), \
+             patch('asyncio.open_connection', AsyncMock(return_value=(Mock(), writer))) as mock_open:
+            # Even the first call skips the full check
+            assert await client.health_check_fast() is True
+            mock_health.assert_not_awaited()
+            mock_open.assert_awaited_once_with('test.supabase.co', 443)
+            writer.close.assert_called_once()
+            writer.wait_closed.assert_awaited_once()
+            
+            mock_open.side_effect = OSError("Connection refused")
+            assert await client.health_check_fast() is False
+            mock_health.assert_not_awaited()
+        
+        # Without a known address the full check runs
+        with patch.object(client, 'health_check', AsyncMock(return_value=True)) as mock_health, \
+             patch.object(client, '_address', None):
+            assert await client.health_check_fast() is True
+            mock_health.assert_awaited_once()
+
 class TestDatabaseModels:
     """Test Pydantic models for database entities"""
     
@@ -38,6 +38,16 @@ class TestSupabaseClientSetup:
         client2 = SupabaseClient()
         assert client1 is client2
         
+    def test_singleton_pattern_across_threads(self):
+        """Test that concurrent first use shares one instance"""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            clients = list(executor.map(lambda _: SupabaseClient(), range(16)))
+        
+        assert all(client is clients[0] for client in clients)
+        assert clients[0].client is SupabaseClient().client
+    
     def test_get_supabase_function(self):
         """Test get_supabase convenience function"""
         client1 = get_supabase()
@@ -315,6 +325,34 @@ class TestDatabaseOperations:
         assert mock_supabase_client.table is not None
         mock_supabase_client.table.assert_called()
     
+    @pytest.mark.asyncio
+    async def test_create_profile_keeps_existing(self, db_service_instance, mock_supabase_client):
+        """Test that creating an existing profile returns it unchanged"""
+        user_id = str(uuid.uuid4())
+        profile_data = {
+            "id": user_id,
+            "first_name": "John",
+            "subscription_tier": "pro",
+            "created_at": datetime.now().isoformat(),
+            "updated_at": datetime.now().isoformat()
+        }
+        
+        mock_table = Mock()
+        mock_supabase_client.table.return_value = mock_table
+        
+        # ON CONFLICT DO NOTHING returns no rows, so the profile is fetched
+        mock_table.upsert.return_value.execute.return_value = Mock(data=[])
+        mock_table.select.return_value.eq.return_value.execute.return_value = Mock(
+            data=[profile_data]
+        )
+        
+        profile = await db_service_instance.create_profile(user_id, ProfileCreate(first_name="Jane"))
+        
+        assert profile.first_name == "John"
+        mock_table.upsert.assert_called_once()
+        assert mock_table.upsert.call_args.kwargs == {"on_conflict": "id", "ignore_duplicates": True}
+        mock_table.insert.assert_not_called()
+    
     def test_brand_operations(self, db_service_instance, mock_supabase_client):
         """Test brand CRUD operations"""
         user_id = str(uuid.uuid4())
@@ -357,6 +395,34 @@ class TestDatabaseOperations:
         
         assert mock_supabase_client.table is not None
     
+    @pytest.mark.asyncio
+    async def test_create_brands_bulk(self, db_service_instance, mock_supabase_client):
+        """Test that bulk brand creation uses a single insert"""
+        user_id = str(uuid.uuid4())
+        brands = [
+            BrandCreate(name=f"Brand {i}", domain=f"https://brand{i}.com")
+            for i in range(3)
+        ]
+        
+        mock_table = Mock()
+        mock_supabase_client.table.return_value = mock_table
+        mock_table.insert.side_effect = lambda rows: Mock(execute=Mock(return_value=Mock(data=[
+            {**row, "created_at": datetime.now().isoformat(), "updated_at": datetime.now().isoformat()}
+            for row in rows
+        ])))
+        
+        created = await db_service_instance.create_brands_bulk(user_id, brands)
+        
+        mock_table.insert.assert_called_once()
+        rows = mock_table.insert.call_args[0][0]
+        assert len(rows) == 3
+        assert all(row["user_id"] == user_id for row in rows)
+        assert len({row["id"] for row in rows}) == 3
+        assert [brand.name for brand in created] == ["Brand 0", "Brand 1", "Brand 2"]
+        
+        assert await db_service_instance.create_brands_bulk(user_id, []) == []
+        mock_table.insert.assert_called_once()
+    
     def test_scan_operations(self, db_service_instance, mock_supabase_client):
         """Test scan CRUD operations"""
         user_id = str(uuid.uuid4())
@@ -544,6 +610,9 @@ class TestCacheService:
         # Key should be 32 characters (truncated SHA256)
         assert len(key1) == 32
         assert isinstance(key1, str)
+        
+        # Keys stay compatible with the database service's key scheme
+        assert key1 == db_service.generate_cache_key(model, prompt, brand, params)
     
     def test_cache_set_and_get(self, cache_service_instance, mock_supabase_client):
         """Test cache set and get operations"""
@@ -576,6 +645,61 @@ class TestCacheService:
         # Verify mock setup
         assert mock_supabase_client.table is not None
     
+    @pytest.mark.asyncio
+    async def test_cache_pipeline(self, cache_service_instance, mock_supabase_client):
+        """Test that pipelined cache operations go out in a single RPC"""
+        cache_key = "test_key_123"
+        test_data = {"response": "test response", "tokens": 50}
+        
+        mock_supabase_client.rpc.return_value.execute.return_value = Mock(
+            data=[True, test_data, True]
+        )
+        
+        results = await cache_service_instance.pipeline([
+            ("set", cache_key, test_data, "gpt-4", "test prompt", 1),
+            ("get", cache_key),
+            ("delete", cache_key)
+        ])
+        
+        assert results == [True, test_data, True]
+        mock_supabase_client.rpc.assert_called_once()
+        name, params = mock_supabase_client.rpc.call_args.args
+        assert name == 'cache_pipeline'
+        assert [op['op'] for op in params['ops']] == ['set', 'get', 'delete']
+        assert params['ops'][0]['entry']['response_data'] == test_data
+        assert params['ops'][0]['entry']['model_name'] == "gpt-4"
+        assert params['ops'][1]['cache_key'] == cache_key
+        
+        # A failed RPC reports every operation as failed
+        mock_supabase_client.rpc.side_effect = Exception("connection lost")
+        results = await cache_service_instance.pipeline([("set", cache_key, test_data), ("get", cache_key)])
+        assert results == [False, None]
+    
+    @pytest.mark.asyncio
+    async def test_cache_set_many(self, cache_service_instance, mock_supabase_client):
+        """Test that bulk cache sets are upserted in chunks"""
+        mock_table = Mock()
+        mock_supabase_client.table.return_value = mock_table
+        mock_table.upsert.side_effect = lambda rows, on_conflict: Mock(
+            execute=Mock(return_value=Mock(data=rows))
+        )
+        
+        items = [(f"key_{i}", {"index": i}, "gpt-4", "prompt", 1) for i in range(1200)]
+        items.append(("key_0", {"index": "latest"}))
+        
+        with patch('services.cache_service.CACHE_BULK_SIZE', 500):
+            stored_count = await cache_service_instance.set_many(items)
+        
+        assert stored_count == 1200
+        chunks = [call.args[0] for call in mock_table.upsert.call_args_list]
+        assert [len(chunk) for chunk in chunks] == [500, 500, 200]
+        assert all(call.kwargs['on_conflict'] == 'cache_key' for call in mock_table.upsert.call_args_list)
+        
+        # A repeated key is written once, with its last value
+        assert chunks[0][0]['cache_key'] == "key_0"
+        assert chunks[0][0]['response_data'] == {"index": "latest"}
+        assert chunks[0][0]['model_name'] == "default"
+    
     def test_cache_expiration_logic(self, cache_service_instance):
         """Test cache expiration logic"""
         now = datetime.now()
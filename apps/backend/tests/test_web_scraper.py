@@ -7,7 +7,10 @@ import os
 from unittest.mock import patch, MagicMock
 from bs4 import BeautifulSoup
 import requests
-from services.web_scraper import WebScraperService
+from services.web_scraper import (
+    WebScraperService, RECOMMENDATION_PRIORITIES, _RECOMMENDATION_RULES,
+    _REC_TITLE_LENGTH, _document_cache, _negative_cache
+)
 
 # Sample HTML content for testing
 SAMPLE_HTML = """
@@ -166,11 +169,28 @@ def web_scraper():
     """Create a WebScraperService instance for testing"""
     return WebScraperService()
 
+@pytest.fixture(autouse=True)
+def clear_negative_cache():
+    """Reset the shared failed-host cache between tests"""
+    _negative_cache.clear()
+    yield
+    _negative_cache.clear()
+
+@pytest.fixture(autouse=True)
+def clear_document_cache():
+    """Reset the shared page analysis cache between tests"""
+    _document_cache.clear()
+    yield
+    _document_cache.clear()
+
 @pytest.fixture
 def mock_response():
     """Create a mock response object"""
     mock = MagicMock()
     mock.content = SAMPLE_HTML.encode('utf-8')
+    mock.iter_content.return_value = [SAMPLE_HTML.encode('utf-8')]
+    mock.headers = {'Content-Type': 'text/html; charset=utf-8'}
+    mock.encoding = 'utf-8'
     mock.status_code = 200
     mock.elapsed.total_seconds.return_value = 0.5
     return mock
@@ -249,6 +269,175 @@ class TestWebScraperService:
         assert result["llm_friendly_score"] == 0
         assert len(result["recommendations"]) > 0
     
+    @pytest.mark.asyncio
+    @patch('requests.Session.get')
+    async def test_audit_website_caches_failed_host(self, mock_get, web_scraper):
+        """Test that a host that just failed is not fetched again"""
+        mock_get.side_effect = requests.exceptions.ConnectionError("Failed to connect")
+        
+        first = await web_scraper.audit_website("https://example.com")
+        second = await web_scraper.audit_website("example.com")
+        
+        assert mock_get.call_count == 1
+        assert second["error_type"] == first["error_type"] == "connection_error"
+        assert second["domain"] == "https://example.com"
+    
+    @pytest.mark.asyncio
+    @patch('requests.Session.get')
+    async def test_audit_website_does_not_cache_client_errors(self, mock_get, web_scraper):
+        """Test that 4xx responses are not remembered as failed hosts"""
+        error_response = MagicMock(status_code=404)
+        mock_get.return_value.raise_for_status.side_effect = requests.exceptions.HTTPError(
+            "404 Not Found", response=error_response
+        )
+        
+        await web_scraper.audit_website("https://example.com")
+        await web_scraper.audit_website("https://example.com")
+        
+        assert mock_get.call_count == 2
+    
+    @pytest.mark.asyncio
+    @patch('requests.Session.get')
+    async def test_audit_website_reuses_unchanged_page(self, mock_get, web_scraper, mock_response):
+        """Test that an unchanged page is not analyzed again unless the cache is bypassed"""
+        mock_get.return_value = mock_response
+
+        with patch.object(web_scraper, '_url_exists', return_value=True), \
+                patch.object(web_scraper, '_analyze_content_structure',
+                             wraps=web_scraper._analyze_content_structure) as analyze:
+            first = await web_scraper.audit_website("https://example.com")
+            first["content_structure"]["headings"]["h1"] = 99
+            second = await web_scraper.audit_website("https://example.com")
+            assert analyze.call_count == 1
+
+            await web_scraper.audit_website("https://example.com", bypass_cache=True)
+            assert analyze.call_count == 2
+
+            await web_scraper.audit_website("https://example.org")
+            assert analyze.call_count == 3
+
+        assert second["content_structure"]["headings"]["h1"] == 1
+        assert second["technical_factors"]["has_sitemap"] is True
+        assert second["llm_friendly_score"] == first["llm_friendly_score"]
+        assert second["recommendations"] == first["recommendations"]
+
+    @pytest.mark.asyncio
+    @patch('requests.Session.get')
+    async def test_audit_website_streams_response(self, mock_get, web_scraper, mock_response):
+        """Test that the page is fetched as a stream and parsed from the streamed body"""
+        mock_get.return_value = mock_response
+        
+        result = await web_scraper.audit_website("https://example.com")
+        
+        assert mock_get.call_args.kwargs["stream"] is True
+        mock_response.close.assert_called_once()
+        assert result["meta_tags"]["title"] == "Test Website - Product Page"
+    
+    @pytest.mark.asyncio
+    async def test_audit_batch_preserves_order(self, web_scraper):
+        """Test that batch audits fan out to the pool and keep input order"""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        domains = ["https://a.example.com", "https://b.example.com", "https://c.example.com"]
+        
+        with ThreadPoolExecutor(max_workers=3) as pool, \
+             patch('services.web_scraper._get_process_pool', return_value=pool), \
+             patch('services.web_scraper._audit_sync', side_effect=lambda d: {"domain": d}):
+            results = await web_scraper.audit_batch(domains)
+        
+        assert [r["domain"] for r in results] == domains
+    
+    def test_process_pool_spawns_workers(self):
+        """Test that batch workers are spawned, not forked from a threaded process"""
+        with patch('services.web_scraper._process_pool', None), \
+                patch('services.web_scraper.atexit.register') as register:
+            from services.web_scraper import _get_process_pool
+            pool = _get_process_pool()
+        
+        try:
+            assert pool._mp_context.get_start_method() == 'spawn'
+            register.assert_called_once_with(pool.shutdown)
+        finally:
+            pool.shutdown()
+    
+    def test_declared_encoding(self, web_scraper):
+        """Test that only a charset named in Content-Type is passed to the parser"""
+        response = MagicMock(encoding='utf-8', headers={'Content-Type': 'text/html; charset=UTF-8'})
+        assert web_scraper._declared_encoding(response) == 'utf-8'
+        
+        # requests reports ISO-8859-1 for text/html without a charset; let the parser detect it
+        response = MagicMock(encoding='ISO-8859-1', headers={'Content-Type': 'text/html'})
+        assert web_scraper._declared_encoding(response) is None
+    
+    def test_read_body_caps_size(self, web_scraper):
+        """Test that oversized bodies are truncated at MAX_BODY_BYTES"""
+        from services.web_scraper import MAX_BODY_BYTES, STREAM_CHUNK_SIZE
+        
+        chunks = iter([b'x' * STREAM_CHUNK_SIZE] * 100)
+        response = MagicMock()
+        response.iter_content.return_value = chunks
+        
+        body = web_scraper._read_body(response)
+        
+        assert len(body) == MAX_BODY_BYTES
+        # Reading stops at the cap instead of draining the stream
+        assert len(list(chunks)) == 100 - MAX_BODY_BYTES // STREAM_CHUNK_SIZE
+    
+    @pytest.mark.asyncio
+    @patch('requests.Session.get')
+    async def test_audit_website_reports_declared_size_of_truncated_body(self, mock_get, web_scraper, mock_response):
+        """Test that page size comes from Content-Length when the body was cut at the cap"""
+        from services.web_scraper import MAX_BODY_BYTES, STREAM_CHUNK_SIZE
+        
+        padding = b'<!-- ' + b'x' * STREAM_CHUNK_SIZE + b' -->'
+        mock_response.iter_content.return_value = iter([SAMPLE_HTML.encode('utf-8')] + [padding] * 64)
+        mock_response.headers = {'Content-Type': 'text/html; charset=utf-8', 'Content-Length': str(4000 * 1024)}
+        mock_get.return_value = mock_response
+        
+        with patch.object(web_scraper, '_url_exists', return_value=False):
+            declared = await web_scraper.audit_website("https://example.com", bypass_cache=True)
+            
+            mock_response.iter_content.return_value = iter([SAMPLE_HTML.encode('utf-8')] + [padding] * 64)
+            mock_response.headers = {'Content-Type': 'text/html; charset=utf-8'}
+            undeclared = await web_scraper.audit_website("https://example.com", bypass_cache=True)
+        
+        assert declared["technical_factors"]["page_size_kb"] == 4000
+        assert any("page size" in rec["issue"].lower() for rec in declared["recommendations"])
+        assert undeclared["technical_factors"]["page_size_kb"] == MAX_BODY_BYTES / 1024
+
+    def test_analyze_technical_factors_probes_sitemap_and_robots(self, web_scraper, soup, mock_response):
+        """Test that sitemap and robots.txt probes are resolved independently"""
+        def fake_head(url, timeout):
+            if url.endswith('/robots.txt'):
+                raise requests.exceptions.Timeout()
+            return MagicMock(status_code=200)
+
+        with patch('requests.Session.head', autospec=True,
+                   side_effect=lambda session, url, timeout: fake_head(url, timeout)) as mock_head:
+            result = web_scraper._analyze_technical_factors(soup, "https://example.com", mock_response)
+
+        assert mock_head.call_count == 2
+        # The probes run on pool threads, each with its own session
+        assert all(call.args[0] is not web_scraper.session for call in mock_head.call_args_list)
+        assert result["has_sitemap"] is True
+        assert result["has_robots_txt"] is False
+        assert result["internal_links"] > 0
+
+    def test_analyze_technical_factors_page_size(self, web_scraper, soup, mock_response):
+        """Test that page size prefers the streamed byte count, then Content-Length"""
+        with patch.object(web_scraper, '_url_exists', return_value=False):
+            streamed = web_scraper._analyze_technical_factors(
+                soup, "https://example.com", mock_response, page_size=2048
+            )
+            mock_response.headers = {'Content-Length': '4096'}
+            declared = web_scraper._analyze_technical_factors(soup, "https://example.com", mock_response)
+            mock_response.headers = {'Content-Length': 'bogus'}
+            fallback = web_scraper._analyze_technical_factors(soup, "https://example.com", mock_response)
+
+        assert streamed["page_size_kb"] == 2
+        assert declared["page_size_kb"] == 4
+        assert fallback["page_size_kb"] == len(SAMPLE_HTML.encode('utf-8')) / 1024
+
     def test_analyze_schema_org(self, web_scraper, soup):
         """Test Schema.org analysis"""
         result = web_scraper._analyze_schema_org(soup)
@@ -264,6 +453,77 @@ class TestWebScraperService:
         assert result["high_value_schemas"]["product"] is True
         assert result["high_value_schemas"]["organization"] is True
     
+    def test_analyze_schema_org_counts_empty_scripts_as_errors(self, web_scraper):
+        """Test that an empty JSON-LD script is reported rather than skipped"""
+        soup = BeautifulSoup(
+            SAMPLE_HTML.replace('</head>', '<script type="application/ld+json"></script></head>'),
+            'html.parser'
+        )
+        
+        result = web_scraper._analyze_schema_org(soup)
+        
+        assert result["count"] == 2
+        assert len(result["errors"]) == 1
+    
+    @pytest.mark.asyncio
+    @patch('requests.Session.get')
+    async def test_audit_website_uses_header_charset_for_schema(self, mock_get, web_scraper, mock_response):
+        """Test that JSON-LD is decoded with a charset declared only in Content-Type"""
+        html = (
+            '<html><head><script type="application/ld+json">'
+            '{"@context": "https://schema.org", "@type": "Organization", "name": "Café Résumé"}'
+            '</script></head><body><p>Hello</p></body></html>'
+        ).encode('utf-8')
+        mock_response.iter_content.return_value = [html]
+        mock_response.headers = {'Content-Type': 'text/html; charset=utf-8'}
+        mock_get.return_value = mock_response
+        
+        with patch.object(web_scraper, '_url_exists', return_value=False):
+            result = await web_scraper.audit_website("https://example.com", bypass_cache=True)
+        
+        assert result["schema_org"]["schemas"][0]["name"] == "Café Résumé"
+    
+    def test_tag_index_is_shared_per_document(self, web_scraper, soup):
+        """Test that head-level tag lists are built once per soup"""
+        index = web_scraper._tag_index(soup)
+        
+        assert web_scraper._tag_index(soup) is index
+        assert len(index['script_ldjson']) == 2
+        assert index['title'].text == "Test Website - Product Page"
+        
+        other_soup = BeautifulSoup(SAMPLE_HTML, 'html.parser')
+        assert web_scraper._tag_index(other_soup) is not index
+    
+    @pytest.mark.asyncio
+    @patch('requests.Session.get')
+    async def test_audit_website_releases_tag_index(self, mock_get, web_scraper, mock_response):
+        """Test that the parsed page is not kept by the scraper after an audit"""
+        mock_get.return_value = mock_response
+        
+        with patch.object(web_scraper, '_url_exists', return_value=False), \
+                patch.object(web_scraper, '_tag_index', wraps=web_scraper._tag_index) as tag_index:
+            await web_scraper.audit_website("https://example.com", bypass_cache=True)
+        
+        assert tag_index.called
+        assert web_scraper._tag_cache is None
+    
+    def test_parse_jsonld_is_shared_per_document(self, web_scraper):
+        """Test that JSON-LD is parsed once and invalid blocks become errors"""
+        html = SAMPLE_HTML.replace(
+            '</head>', '<script type="application/ld+json">{not json}</script></head>'
+        )
+        soup = BeautifulSoup(html, 'html.parser')
+        parsed = web_scraper._parse_jsonld(soup)
+        
+        assert web_scraper._parse_jsonld(soup) is parsed
+        assert [data["@type"] for data, error in parsed[:2]] == ["Product", "Organization"]
+        assert parsed[2][0] is None
+        assert parsed[2][1].startswith("Invalid JSON")
+        
+        result = web_scraper._analyze_schema_org(soup)
+        assert result["count"] == 2
+        assert len(result["errors"]) == 1
+    
     def test_analyze_meta_tags(self, web_scraper, soup):
         """Test meta tag analysis"""
         result = web_scraper._analyze_meta_tags(soup)
@@ -318,7 +578,23 @@ class TestWebScraperService:
         assert "flesch_kincaid_grade" in result["readability_score"]
         assert "avg_sentence_length" in result["readability_score"]
         assert "avg_word_length" in result["readability_score"]
-    
+
+    def test_analyze_content_structure_matches_get_text(self, web_scraper):
+        """Test the single-pass text excludes scripts, styles and comments like get_text()"""
+        html = (
+            '<html><head><title>T</title><style>p { color: red }</style></head>'
+            '<body><!-- hidden note --><p>Hi <b>there</b></p>'
+            '<script>var hidden = "words";</script><img src="a.png"></body></html>'
+        )
+        soup = BeautifulSoup(html, 'html.parser')
+        result = web_scraper._analyze_content_structure(soup)
+
+        assert result["word_count"] == len(soup.get_text().split())
+        assert web_scraper._element_index(soup)["text"] == soup.get_text()
+        assert result["paragraphs"] == 1
+        assert result["images"] == 1
+        assert result["images_with_alt"] == 0
+
     def test_detect_faq_sections(self, web_scraper, soup):
         """Test FAQ section detection"""
         result = web_scraper._detect_faq_sections(soup)
@@ -338,7 +614,24 @@ class TestWebScraperService:
         assert "answer" in question
         assert len(question["question"]) > 0
         assert len(question["answer"]) > 0
-    
+
+    def test_detect_faq_sections_from_schema(self, web_scraper):
+        """Test FAQ schema detection parses only FAQPage scripts when standalone"""
+        faq_script = f'<script type="application/ld+json">{json.dumps(SAMPLE_FAQ_SCHEMA)}</script>'
+        soup = BeautifulSoup(SAMPLE_HTML.replace('</head>', faq_script + '</head>'), 'html.parser')
+
+        with patch('services.web_scraper.orjson.loads', wraps=json.loads) as mock_loads:
+            result = web_scraper._detect_faq_sections(soup)
+
+        assert mock_loads.call_count == 1
+        schema_sections = [section for section in result if section["type"] == "schema"]
+        assert len(schema_sections) == 1
+        assert len(schema_sections[0]["questions"]) == 2
+
+        # Once the page's JSON-LD has been parsed, FAQ detection reuses it
+        web_scraper._parse_jsonld(soup)
+        assert web_scraper._detect_faq_sections(soup) == result
+
     def test_is_faq_schema(self, web_scraper):
         """Test FAQ schema detection"""
         # Test with FAQ schema
@@ -346,7 +639,45 @@ class TestWebScraperService:
         
         # Test with non-FAQ schema
         assert web_scraper._is_faq_schema(SAMPLE_SCHEMA) is False
-    
+
+    def test_count_syllables(self, web_scraper):
+        """Test syllable approximation"""
+        assert web_scraper._count_syllables("cat") == 1
+        assert web_scraper._count_syllables("Audit") == 2
+        assert web_scraper._count_syllables("make") == 1  # silent 'e'
+        assert web_scraper._count_syllables("the") == 1
+        assert web_scraper._count_syllables("readability!") == 5
+        assert web_scraper._count_syllables("123") == 0
+
+    def test_calculate_readability_is_cached(self, web_scraper):
+        """Test that repeated texts reuse cached readability metrics"""
+        from services.web_scraper import _readability_cache
+
+        text = "Readability caching test. It has two sentences."
+        first = web_scraper._calculate_readability(text)
+
+        with patch.object(web_scraper, '_compute_readability') as mock_compute:
+            second = web_scraper._calculate_readability(text)
+
+        mock_compute.assert_not_called()
+        assert second == first
+        assert second is not first
+        assert first["avg_sentence_length"] == 3.5
+        _readability_cache.clear()
+
+    def test_analyze_keyword_density(self, web_scraper):
+        """Test keyword counting skips stop words and short words"""
+        result = web_scraper._analyze_keyword_density(
+            "The audit tool runs an audit. SEO audit is an audit of SEO, go."
+        )
+
+        assert list(result["top_keywords"])[:2] == ["audit", "seo"]
+        assert result["top_keywords"]["audit"]["count"] == 4
+        assert "the" not in result["top_keywords"]
+        # Short words still count towards the total, just not as keywords
+        assert result["total_words"] == 9
+        assert result["unique_words"] == 4
+
     def test_extract_faq_questions(self, web_scraper):
         """Test FAQ question extraction from schema"""
         questions = web_scraper._extract_faq_questions(SAMPLE_FAQ_SCHEMA)
@@ -509,6 +840,16 @@ class TestWebScraperService:
         assert "content" in categories
         assert "technical" in categories
 
+    def test_recommendation_rules(self):
+        """Test the rule table is priority ordered and rules can be checked on their own"""
+        priorities = [RECOMMENDATION_PRIORITIES.index(template[0]) for _, _, template, _ in _RECOMMENDATION_RULES]
+        assert priorities == sorted(priorities)
+
+        applies, _, _, values = next(rule for rule in _RECOMMENDATION_RULES if rule[2] is _REC_TITLE_LENGTH)
+        assert applies({"meta_tags": {"title": "Hi", "title_length": 2}})
+        assert not applies({"meta_tags": {"title": "", "title_length": 0}})
+        assert values({"meta_tags": {"title": "Hi", "title_length": 2}}) == {"length": 2}
+
 
 class TestEnhancedWebScraperService:
     """Test cases for enhanced WebScraperService features"""
@@ -585,6 +926,14 @@ class TestEnhancedWebScraperService:
         # Organization is a high-value type, so score should be decent
         assert score >= 30
     
+    def test_document_results_are_cached(self, web_scraper):
+        """Test repeated analysis of the same soup reuses the first result"""
+        soup = BeautifulSoup('<body><main>Main</main><blockquote>Quote</blockquote></body>', 'html.parser')
+
+        first = web_scraper._detect_structured_patterns(soup)
+        first["blockquotes"] = 99
+        assert web_scraper._detect_structured_patterns(soup) == {"blockquotes": 1}
+
     def test_analyze_semantic_elements(self, soup):
         """Test semantic HTML element analysis"""
         # Add some semantic elements to the soup for testing
@@ -679,6 +1028,19 @@ class TestEnhancedWebScraperService:
         assert any("Apple" in org for org in result["organizations"]) or \
                any("Google" in org for org in result["organizations"]) or \
                any("Microsoft" in org for org in result["organizations"])
+
+    def test_analyze_entity_mentions_prefilters(self, web_scraper):
+        """Test pages without organization suffixes or commas skip those scans"""
+        nav_text = " ".join(["Home About Products Contact Blog Careers"] * 500)
+
+        result = web_scraper._analyze_entity_mentions(nav_text)
+
+        assert result["organizations"] == []
+        assert result["locations"] == []
+        assert result["people"][0] == "Home About"
+
+        lowercase = web_scraper._analyze_entity_mentions("acme widgets inc, paris, france " * 100)
+        assert lowercase == {"people": [], "organizations": [], "locations": [], "products": []}
     
     def test_enhanced_recommendations(self, web_scraper):
         """Test enhanced recommendation generation"""